@@ -1,11 +1,28 @@
-from flask import Flask, render_template_string, request, send_file
+from flask import Flask, Response, render_template_string, request, jsonify
+from werkzeug.wsgi import wrap_file
 import yt_dlp
 import os
-import uuid
 import logging
 import re
 import requests
+import io
 import json
+import mimetypes
+import time
+from concurrent.futures import Future
+from jobs import JobQueue, QueueFullError, JOB_DONE
+from metadata_cache import MetadataCache, start_warm_up, video_key
+from content_store import ContentStore, make_key
+from inflight import InflightRegistry
+from reaper import DiskReaper
+from postprocess import PostProcessor, ACTION_NONE, priority as postprocess_priority
+from ffmpeg_pool import FFmpegPool
+from progressive import ProgressiveFile, is_progressive
+import platforms
+from profiles import ProfileRegistry
+from ydl_pool import YoutubeDLPool
+from cookie_store import CookieStore
+from fragments import FragmentBudget
 
 app = Flask(__name__)
 
@@ -17,34 +34,33 @@ logger = logging.getLogger(__name__)
 DOWNLOAD_FOLDER = 'downloads'
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
+# /jobs/<id>/stream 이 다운로드 시작을 기다리는 최대 시간(초)
+STREAM_WAIT = int(os.environ.get('STREAM_WAIT', 30))
+
+# /file 응답의 Cache-Control max-age (CDN 캐시용, 초)
+FILE_CACHE_MAX_AGE = int(os.environ.get('FILE_CACHE_MAX_AGE', 86400))
+
+# 앞단 웹서버(nginx/Apache)가 X-Sendfile 로 직접 파일을 보내게 할지 여부.
+# 끄면 gunicorn 등 WSGI 서버의 file_wrapper(sendfile)를 사용한다.
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+
 def detect_platform(url):
     """URL에서 플랫폼을 감지합니다."""
-    url_lower = url.lower()
-    
-    if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-        return 'YouTube', 'fab fa-youtube', '#FF0000'
-    elif 'tiktok.com' in url_lower:
-        return 'TikTok', 'fab fa-tiktok', '#000000'
-    elif 'instagram.com' in url_lower or 'instagr.am' in url_lower:
-        return 'Instagram', 'fab fa-instagram', '#E4405F'
-    elif 'reddit.com' in url_lower or 'redd.it' in url_lower:
-            return 'Reddit', 'fab fa-reddit', '#FF4500'
-    elif 'twitter.com' in url_lower or 'x.com' in url_lower:
-        return 'Twitter/X', 'fab fa-twitter', '#1DA1F2'
-    elif 'threads.net' in url_lower:
-        return 'Threads', 'fab fa-threads', '#000000'
-    else:
-        return 'Unknown', 'fas fa-video', '#666666'
+    route = platforms.route(url)
+    return route.platform, route.icon, route.color
+
+# Render 환경 확인 (시작 시 한 번만)
+IS_RENDER = (
+    os.environ.get('RENDER') == 'true' or 
+    os.environ.get('RENDER_SERVICE_NAME') is not None or
+    'onrender.com' in os.environ.get('HOSTNAME', '')
+)
 
 def get_platform_specific_options(platform):
-    """플랫폼별 최적화된 다운로드 옵션을 반환합니다."""
-    # Render 환경 확인 (더 정확한 감지)
-    is_render = (
-        os.environ.get('RENDER') == 'true' or 
-        os.environ.get('RENDER_SERVICE_NAME') is not None or
-        'onrender.com' in os.environ.get('HOSTNAME', '')
-    )
+    """플랫폼별 최적화된 다운로드 옵션을 만듭니다.
     
+    요청마다 호출하지 말고 option_profiles 로 조회합니다 (시작 시와 설정 파일 변경 시에만 호출됨).
+    """
     base_options = {
         'quiet': False,
         'no_warnings': False,
@@ -56,6 +72,9 @@ def get_platform_specific_options(platform):
         'retries': 10,
         'fragment_retries': 10,
         'http_chunk_size': 10485760,  # 10MB chunks
+        'segment_connections': int(os.environ.get('DOWNLOAD_SEGMENTS', 4)),  # 단일 파일 분할 다운로드 연결 수
+        'concurrent_fragment_downloads': int(os.environ.get('FRAGMENT_CONCURRENCY', 4)),  # 작업당 HLS/DASH 동시 조각 수
+        'parallel_formats': os.environ.get('PARALLEL_FORMATS', '1') == '1',  # 영상/음성 포맷 동시 다운로드
     }
     
     if platform == 'TikTok':
@@ -63,8 +82,6 @@ def get_platform_specific_options(platform):
             'format': 'best[ext=mp4]/best',
             'merge_output_format': 'mp4',
         })
-        if not is_render:
-            base_options['cookiesfrombrowser'] = ('chrome',)
     elif platform == 'Instagram':
         base_options.update({
             'format': 'best[ext=mp4]/best[height<=1080]/best',
@@ -73,8 +90,6 @@ def get_platform_specific_options(platform):
             'ignoreerrors': True,
             'extractor_retries': 5,
         })
-        if not is_render:
-            base_options['cookiesfrombrowser'] = ('chrome',)
     elif platform == 'Reddit':
         base_options.update({
             'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
@@ -89,21 +104,14 @@ def get_platform_specific_options(platform):
             'extractaudio': False,
             'audioformat': 'mp3',
             'audioquality': '0',
-            'recodevideo': 'mp4',
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }],
             'prefer_ffmpeg': True,
-            'keepvideo': True,
+            'keepvideo': False,  # 변환 전 원본은 남기지 않음
             'writesubtitles': False,
             'writeautomaticsub': False,
             'subtitleslangs': ['en'],
             'skip_download': False,
             'outtmpl': '%(title)s.%(ext)s',
         })
-        if not is_render:
-            base_options['cookiesfrombrowser'] = ('chrome',)
     elif platform == 'Twitter/X':
         base_options.update({
             'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
@@ -118,21 +126,14 @@ def get_platform_specific_options(platform):
             'extractaudio': False,
             'audioformat': 'mp3',
             'audioquality': '0',
-            'recodevideo': 'mp4',
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }],
             'prefer_ffmpeg': True,
-            'keepvideo': True,
+            'keepvideo': False,  # 변환 전 원본은 남기지 않음
             'writesubtitles': False,
             'writeautomaticsub': False,
             'subtitleslangs': ['en'],
             'skip_download': False,
             'outtmpl': '%(title)s.%(ext)s',
         })
-        if not is_render:
-            base_options['cookiesfrombrowser'] = ('chrome',)
     elif platform == 'Threads':
         # Threads는 Instagram 계열이므로 유사한 설정 사용
         base_options.update({
@@ -146,8 +147,6 @@ def get_platform_specific_options(platform):
             'no_warnings': False,
             'quiet': False,
         })
-        if not is_render:
-            base_options['cookiesfrombrowser'] = ('chrome',)
     else:  # YouTube 및 기타
         base_options.update({
             'format': 'best[ext=mp4]/best',
@@ -179,9 +178,15 @@ def get_platform_specific_options(platform):
                 'youtube_include_dash_manifest': False,
                 'youtube_include_hls_manifest': False,
                 'no_check_certificates': True,
-                'cookiesfrombrowser': None,  # Render에서는 브라우저 쿠키 사용 불가
                 'use_extractors': ['youtube:tab', 'youtube'],
             })
+            if IS_RENDER:
+                # Render 환경에서 YouTube 다운로드 - 특별 설정 적용
+                base_options.update({
+                    'prefer_insecure': True,
+                    'geo_verification_proxy': None,
+                    'source_address': '0.0.0.0',
+                })
     
     return base_options
 
@@ -481,6 +486,13 @@ HTML_FORM = '''
         </div>
       {% endif %}
       
+      {% if job_id %}
+        <div class="success" id="jobStatus" data-job-id="{{ job_id }}">
+          <i class="fas fa-spinner fa-spin"></i>
+          <span id="jobMessage">다운로드 대기 중입니다...</span>
+        </div>
+      {% endif %}
+      
       <div class="supported-platforms">
         <h3>지원하는 플랫폼</h3>
         <div class="platform-grid">
@@ -539,49 +551,72 @@ HTML_FORM = '''
     </div>
     
     <script>
+      // 플랫폼 미리보기: 서버와 같은 라우터로 판정하도록 /platform 에 묻는다
+      let platformRequest = 0;
+      let platformTimer = null;
       document.getElementById('urlInput').addEventListener('input', function() {
-        const url = this.value;
-        if (url) {
-          const urlLower = url.toLowerCase();
-          let platform = 'Unknown';
-          let icon = 'fas fa-video';
-          let color = '#666666';
-          
-          if (urlLower.includes('youtube.com') || urlLower.includes('youtu.be')) {
-            platform = 'YouTube';
-            icon = 'fab fa-youtube';
-            color = '#FF0000';
-          } else if (urlLower.includes('tiktok.com')) {
-            platform = 'TikTok';
-            icon = 'fab fa-tiktok';
-            color = '#000000';
-          } else if (urlLower.includes('instagram.com') || urlLower.includes('instagr.am')) {
-            platform = 'Instagram';
-            icon = 'fab fa-instagram';
-            color = '#E4405F';
-          } else if (urlLower.includes('reddit.com') || urlLower.includes('redd.it')) {
-            platform = 'Reddit';
-            icon = 'fab fa-reddit';
-            color = '#FF4500';
-          } else if (urlLower.includes('twitter.com') || urlLower.includes('x.com')) {
-            platform = 'Twitter/X';
-            icon = 'fab fa-twitter';
-            color = '#1DA1F2';
-          } else if (urlLower.includes('threads.net')) {
-            platform = 'Threads';
-            icon = 'fab fa-threads';
-            color = '#000000';
-          }
-          
-          document.getElementById('platformName').textContent = platform;
-          document.getElementById('platformIcon').className = icon;
-          document.getElementById('platformIcon').style.color = color;
-          document.getElementById('platformInfo').classList.add('show');
-        } else {
+        const url = this.value.trim();
+        const requestId = ++platformRequest;
+        clearTimeout(platformTimer);
+        if (!url) {
           document.getElementById('platformInfo').classList.remove('show');
+          return;
         }
+        platformTimer = setTimeout(function() {
+          fetch('/platform?url=' + encodeURIComponent(url))
+            .then(function(res) { return res.json(); })
+            .then(function(info) {
+              // 더 최근 입력에 대한 응답이 이미 나갔으면 무시
+              if (requestId !== platformRequest) return;
+              document.getElementById('platformName').textContent = info.platform;
+              document.getElementById('platformIcon').className = info.icon;
+              document.getElementById('platformIcon').style.color = info.color;
+              document.getElementById('platformInfo').classList.add('show');
+            })
+            .catch(function() {});
+        }, 150);
       });
       
+      // 작업 상태 폴링
+      const jobStatus = document.getElementById('jobStatus');
+      if (jobStatus) {
+        const jobId = jobStatus.dataset.jobId;
+        const messages = {
+          queued: '다운로드 대기 중입니다...',
+          running: '다운로드 중입니다...',
+          processing: '영상을 변환하고 있습니다...',
+        };
+        const poll = function() {
+          fetch('/jobs/' + jobId)
+            .then(function(res) { return res.json(); })
+            .then(function(job) {
+              if (job.status === 'done') {
+                jobStatus.innerHTML = '<i class="fas fa-check-circle"></i> 다운로드가 완료되었습니다!<br>' +
+                  '<a href="/file/' + encodeURIComponent(job.filename) + '" class="download-link">' +
+                  '<i class="fas fa-download"></i> 파일 다운로드</a>';
+              } else if (job.status === 'failed') {
+                jobStatus.className = 'error';
+                jobStatus.innerHTML = '<i class="fas fa-exclamation-triangle"></i> ';
+                jobStatus.appendChild(document.createTextNode('다운로드 실패: ' + (job.error || '알 수 없는 오류')));
+              } else {
+                document.getElementById('jobMessage').textContent = messages[job.status] || job.status;
+                if (job.streamable && !document.getElementById('streamLink')) {
+                  const link = document.createElement('a');
+                  link.id = 'streamLink';
+                  link.href = job.stream_url;
+                  link.className = 'download-link';
+                  link.innerHTML = '<i class="fas fa-bolt"></i> 지금 바로 받기';
+                  jobStatus.appendChild(document.createElement('br'));
+                  jobStatus.appendChild(link);
+                }
+                setTimeout(poll, 2000);
+              }
+            })
+            .catch(function() { setTimeout(poll, 5000); });
+        };
+        poll();
+      }
+      
       document.getElementById('downloadForm').addEventListener('submit', function() {
         document.getElementById('loading').style.display = 'block';
         document.getElementById('downloadBtn').disabled = true;
@@ -592,163 +627,469 @@ HTML_FORM = '''
 </html>
 '''
 
-@app.route('/', methods=['GET', 'POST'])
-def index():
-    if request.method == 'POST':
-        return download()
-    return render_template_string(HTML_FORM)
+def downloaded_filepath(ydl, info):
+    """process_ie_result 결과에서 최종 파일 경로를 찾습니다."""
+    for download in info.get('requested_downloads') or []:
+        if download.get('filepath'):
+            return download['filepath']
+    return ydl.prepare_filename(info)
 
-@app.route('/download', methods=['POST'])
-def download():
-    url = request.form.get('url')
-    if not url:
-        return render_template_string(HTML_FORM, error="URL을 입력하세요.")
+def content_key(key, format_selector):
+    """(플랫폼, 영상 ID) 키와 포맷으로 저장소 키를 만듭니다."""
+    if not key or not key[1]:
+        return None
+    return make_key(key[0], key[1], format_selector)
+
+def run_download(job):
+    """작업 워커에서 다운로드를 실행하고, 같은 영상을 기다리는 요청들에 결과를 전달합니다.
     
-    # 플랫폼 감지
-    platform, icon, color = detect_platform(url)
-    logger.info(f"감지된 플랫폼: {platform}")
+    후처리는 ffmpeg 풀에서 진행되므로 파일 이름으로 끝나는 Future를 반환합니다.
+    """
+    try:
+        result = perform_download(job)
+    except Exception as e:
+        if job.flight:
+            inflight.finish(job.flight, error=e)
+        raise
+    if not isinstance(result, Future):
+        future = Future()
+        future.set_result(result)
+        result = future
+    result.add_done_callback(lambda future: download_finished(job, future))
+    return result
+
+def download_finished(job, future):
+    """후처리까지 끝난 뒤 정리기에 등록하고 대기 중인 요청들에 결과를 전달합니다."""
+    error = future.exception()
+    if error is None:
+        reaper.track(future.result())
+    if job.flight:
+        inflight.finish(job.flight, result=None if error else future.result(), error=error)
+
+def finalize_download(job, filename, store_key, video_id, format_selector):
+    """다운로드된 파일의 후처리를 ffmpeg 풀에 맡기고, 저장소 등록까지 끝나면 완료되는 Future를 반환합니다."""
+    job_plan = post_processor.plan(filename)
+    
+    def finish(threads=None):
+        # mp4로 맞추기 (가능하면 재인코딩 없이 remux)
+        path, job.postprocess = post_processor.execute(job_plan, threads)
+        # 같은 영상의 다음 요청이 재사용하도록 저장소에 등록
+        if store_key:
+            return content_store.put(store_key, path, job.platform, video_id, format_selector)
+        return os.path.basename(path)
+    
+    if job_plan['action'] == ACTION_NONE:
+        future = Future()
+        try:
+            future.set_result(finish())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    logger.info(f"후처리 대기열에 등록: {job.id} ({job_plan['action']})")
+    return ffmpeg_pool.submit(finish, priority=postprocess_priority(job_plan))
+
+def perform_download(job):
+    """실제 다운로드를 수행하고 완성된 파일 이름(후처리 중이면 Future)을 반환합니다."""
+    url = job.url
+    platform = job.platform
     
     # 고유 파일명 생성
-    outtmpl = os.path.join(DOWNLOAD_FOLDER, f"{uuid.uuid4()}.%(ext)s")
+    outtmpl = os.path.join(DOWNLOAD_FOLDER, f"{job.id}.%(ext)s")
+    
+    logger.info(f"다운로드 시작: {url} (플랫폼: {platform})")
     
-    # 플랫폼별 최적화된 옵션 가져오기
-    ydl_opts = get_platform_specific_options(platform)
-    ydl_opts['outtmpl'] = outtmpl
+    download_success = False
+    filename = None
+    base = None
+    cache_key = job.key
     
+    # 첫 번째 시도
     try:
-        logger.info(f"다운로드 시작: {url} (플랫폼: {platform})")
-        
-        # YouTube의 경우 추가 시도
-        if 'youtube' in platform.lower() and (os.environ.get('RENDER') or os.environ.get('RENDER_SERVICE_NAME')):
-            logger.info("Render 환경에서 YouTube 다운로드 - 특별 설정 적용")
-            ydl_opts.update({
-                'no_check_certificates': True,
-                'prefer_insecure': True,
-                'geo_verification_proxy': None,
-                'source_address': '0.0.0.0',
-            })
-        
-        download_success = False
-        filename = None
-        base = None
-        
-        # 첫 번째 시도
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        # 미리 만들어 둔 플랫폼별 YoutubeDL을 빌려 outtmpl만 바꿔 사용
+        with ydl_pool.checkout(platform, outtmpl=outtmpl, job_id=job.id) as ydl:
+            info = metadata_cache.get(cache_key)
+            if info:
+                logger.info("캐시된 영상 정보 사용")
+            else:
                 logger.info("영상 정보 추출 시작...")
                 info = ydl.extract_info(url, download=False)
                 if not info:
                     raise Exception("영상 정보를 가져올 수 없습니다.")
+                metadata_cache.put(cache_key, info, platform)
+            
+            title = info.get('title', 'Unknown')
+            logger.info(f"영상 제목: {title}")
+            
+            # 단일 mp4 포맷이면 다운로드 중에도 /jobs/<id>/stream 으로 전달 가능
+            job.progressive = ProgressiveFile(enabled=is_progressive(info))
+            if job.progressive.enabled:
+                ydl.add_progress_hook(job.progressive.hook)
+            
+            # 실제 다운로드 실행 (추출 결과를 재사용해 추출기를 다시 돌리지 않음)
+            logger.info("실제 다운로드 시작...")
+            info = ydl.process_ie_result(info, download=True)
+            
+            # 다운로드된 파일 찾기
+            filename = downloaded_filepath(ydl, info)
                 
-                title = info.get('title', 'Unknown')
-                logger.info(f"영상 제목: {title}")
-                
-                # 실제 다운로드 실행
-                logger.info("실제 다운로드 시작...")
-                ydl.download([url])
+            if os.path.exists(filename):
+                # 후처리와 저장소 등록은 ffmpeg 풀에서 (다운로드 워커는 바로 다음 작업으로)
+                format_selector = ydl.params.get('format')
+                # URL만으로 영상을 특정할 수 없으면(직접 링크 등) 저장소에 등록하지 않는다.
+                # Generic 추출기의 ID는 파일 이름일 뿐이라 다른 서버의 video.mp4끼리 같은 키가 된다
+                store_key = content_key(cache_key, format_selector)
+                base = finalize_download(job, filename, store_key, info.get('id'), format_selector)
+                download_success = True
+                logger.info(f"다운로드 완료: {os.path.basename(filename)}")
                 
-                # 다운로드된 파일 찾기
-                filename = ydl.prepare_filename(info)
-                if not filename.endswith('.mp4'):
-                    filename = os.path.splitext(filename)[0] + '.mp4'
-                    
-                if os.path.exists(filename):
-                    base = os.path.basename(filename)
-                    download_success = True
-                    logger.info(f"다운로드 완료: {base}")
-                    
-        except Exception as e:
-            logger.error(f"첫 번째 시도 실패: {str(e)}")
+    except Exception as e:
+        logger.error(f"첫 번째 시도 실패: {str(e)}")
+        if job.progressive:
+            job.progressive.fail(e)
+        # 만료되었거나 잘못된 정보일 수 있으므로 캐시에서 제거
+        metadata_cache.invalidate(cache_key)
+        
+        # YouTube의 경우 여러 방법으로 재시도
+        if 'youtube' in platform.lower():
+            logger.info("YouTube 다운로드 재시도 - 봇 감지 우회 설정")
             
-            # YouTube의 경우 여러 방법으로 재시도
-            if 'youtube' in platform.lower():
-                logger.info("YouTube 다운로드 재시도 - 봇 감지 우회 설정")
-                
-                # 방법 1: 모바일 User-Agent 사용
-                mobile_opts = {
-                    'format': 'best',
-                    'outtmpl': outtmpl,
-                    'quiet': False,
-                    'no_warnings': False,
-                    'extract_flat': False,
-                    'user_agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
-                    'http_headers': {
-                        'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                        'Accept-Language': 'en-us',
-                        'Accept-Encoding': 'gzip, deflate',
-                        'Connection': 'keep-alive',
-                    },
-                    'extractor_args': {
-                        'youtube': {
-                            'player_client': ['android', 'web'],
-                            'player_skip': ['webpage', 'config'],
-                        }
-                    },
-                }
+            # 방법 1: 모바일 User-Agent 사용
+            mobile_opts = {
+                'format': 'best',
+                'outtmpl': outtmpl,
+                'quiet': False,
+                'no_warnings': False,
+                'extract_flat': False,
+                'user_agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
+                'http_headers': {
+                    'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Mobile/15E148 Safari/604.1',
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Language': 'en-us',
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Connection': 'keep-alive',
+                },
+                'extractor_args': {
+                    'youtube': {
+                        'player_client': ['android', 'web'],
+                        'player_skip': ['webpage', 'config'],
+                    }
+                },
+            }
+            
+            try:
+                with yt_dlp.YoutubeDL(mobile_opts) as ydl:
+                    ydl.download([url])
+                    
+                    # 다운로드된 파일 찾기
+                    for file in os.listdir(DOWNLOAD_FOLDER):
+                        if file.startswith(os.path.basename(outtmpl).split('.')[0]):
+                            filename = os.path.join(DOWNLOAD_FOLDER, file)
+                            base = file
+                            download_success = True
+                            logger.info(f"모바일 UA로 다운로드 성공: {base}")
+                            break
+                            
+            except Exception as mobile_error:
+                logger.error(f"모바일 UA 시도 실패: {str(mobile_error)}")
                 
-                try:
-                    with yt_dlp.YoutubeDL(mobile_opts) as ydl:
-                        ydl.download([url])
-                        
-                        # 다운로드된 파일 찾기
-                        for file in os.listdir(DOWNLOAD_FOLDER):
-                            if file.startswith(os.path.basename(outtmpl).split('.')[0]):
-                                filename = os.path.join(DOWNLOAD_FOLDER, file)
-                                base = file
-                                download_success = True
-                                logger.info(f"모바일 UA로 다운로드 성공: {base}")
-                                break
-                                
-                except Exception as mobile_error:
-                    logger.error(f"모바일 UA 시도 실패: {str(mobile_error)}")
+                # 방법 2: 임베드 페이지 사용
+                if not download_success:
+                    logger.info("YouTube 다운로드 재시도 - 임베드 방식")
+                    embed_opts = {
+                        'format': 'best',
+                        'outtmpl': outtmpl,
+                        'quiet': False,
+                        'force_generic_extractor': False,
+                        'extractor_args': {
+                            'youtube': {
+                                'player_client': ['web_embedded'],
+                            }
+                        },
+                    }
                     
-                    # 방법 2: 임베드 페이지 사용
-                    if not download_success:
-                        logger.info("YouTube 다운로드 재시도 - 임베드 방식")
-                        embed_opts = {
-                            'format': 'best',
-                            'outtmpl': outtmpl,
-                            'quiet': False,
-                            'force_generic_extractor': False,
-                            'extractor_args': {
-                                'youtube': {
-                                    'player_client': ['web_embedded'],
-                                }
-                            },
-                        }
-                        
-                        try:
-                            with yt_dlp.YoutubeDL(embed_opts) as ydl:
-                                ydl.download([url])
-                                
-                                for file in os.listdir(DOWNLOAD_FOLDER):
-                                    if file.startswith(os.path.basename(outtmpl).split('.')[0]):
-                                        filename = os.path.join(DOWNLOAD_FOLDER, file)
-                                        base = file
-                                        download_success = True
-                                        logger.info(f"임베드 방식으로 다운로드 성공: {base}")
-                                        break
-                                        
-                        except Exception as embed_error:
-                            logger.error(f"임베드 방식도 실패: {str(embed_error)}")
-        
-        if download_success and base:
-            return render_template_string(HTML_FORM, filename=base)
+                    try:
+                        with yt_dlp.YoutubeDL(embed_opts) as ydl:
+                            ydl.download([url])
+                            
+                            for file in os.listdir(DOWNLOAD_FOLDER):
+                                if file.startswith(os.path.basename(outtmpl).split('.')[0]):
+                                    filename = os.path.join(DOWNLOAD_FOLDER, file)
+                                    base = file
+                                    download_success = True
+                                    logger.info(f"임베드 방식으로 다운로드 성공: {base}")
+                                    break
+                                    
+                    except Exception as embed_error:
+                        logger.error(f"임베드 방식도 실패: {str(embed_error)}")
+    
+    if download_success and base:
+        return base
+    raise Exception("다운로드를 완료할 수 없습니다.")
+
+# 플랫폼별 yt-dlp 옵션 템플릿 (PROFILE_CONFIG 파일이 바뀌면 자동으로 다시 읽음)
+option_profiles = ProfileRegistry(
+    get_platform_specific_options,
+    platforms.NAMES,
+    config_path=os.environ.get('PROFILE_CONFIG'),
+)
+
+# 쿠키 저장소 (쿠키 파일을 한 번 읽고, 파일이 바뀌면 다시 읽음)
+cookie_store = CookieStore(
+    path=os.environ.get('COOKIE_FILE'),
+    browser=os.environ.get('COOKIES_FROM_BROWSER'),
+)
+
+# 모든 작업이 함께 쓰는 HLS/DASH 동시 조각 수 예산
+fragment_budget = FragmentBudget(int(os.environ.get('FRAGMENT_BUDGET', 16)))
+
+# 프로필별 YoutubeDL 인스턴스 풀 (추출기/쿠키 초기화를 작업마다 반복하지 않음)
+ydl_pool = YoutubeDLPool(
+    option_profiles,
+    max_idle=int(os.environ.get('YDL_POOL_SIZE', 4)),
+    cookie_store=cookie_store,
+    fragment_budget=fragment_budget,
+)
+
+# 영상 정보 캐시 (같은 영상의 반복 요청은 추출기를 다시 돌리지 않음)
+metadata_cache = MetadataCache(max_entries=int(os.environ.get('METADATA_CACHE_SIZE', 512)))
+
+# 처음 보는 사이트의 첫 요청이 추출기 로드를 기다리지 않도록 미리 준비
+start_warm_up()
+
+# 후처리 (코덱을 확인해 remux 또는 필요한 경우에만 재인코딩)
+post_processor = PostProcessor()
+
+# ffmpeg 풀 (코어 수에 맞춘 동시 변환 수, 짧은 영상 우선)
+ffmpeg_pool = FFmpegPool(
+    workers=int(os.environ.get('FFMPEG_WORKERS', 0)) or None,
+    threads_per_job=int(os.environ.get('FFMPEG_THREADS', 0)) or None,
+)
+
+# 완성 파일 저장소 (같은 영상은 디스크에 한 번만 저장)
+content_store = ContentStore(DOWNLOAD_FOLDER)
+
+# 다운로드 폴더 정리기 (용량/보관 시간 한도, 전송 중인 파일은 제외)
+reaper = DiskReaper(
+    DOWNLOAD_FOLDER,
+    max_bytes=int(os.environ.get('DOWNLOAD_BUDGET_MB', 2048)) * 1024 * 1024,
+    max_age=int(os.environ.get('DOWNLOAD_MAX_AGE', 6 * 3600)),
+    interval=int(os.environ.get('REAPER_INTERVAL', 60)),
+    in_use=lambda filename: content_store.refcount(filename) > 0,
+    on_evict=content_store.remove,
+)
+reaper.start()
+
+# 진행 중인 다운로드 (같은 영상의 동시 요청은 하나의 다운로드만 실행)
+inflight = InflightRegistry(timeout=int(os.environ.get('INFLIGHT_TIMEOUT', 900)))
+
+# 다운로드 작업 큐 (HTTP 워커 수와 별개로 다운로드 동시성을 조절)
+job_queue = JobQueue(
+    run_download,
+    max_workers=int(os.environ.get('DOWNLOAD_WORKERS', 2)),
+    max_pending=int(os.environ.get('DOWNLOAD_QUEUE_SIZE', 50)),
+)
+
+def enqueue_download(url):
+    """URL을 검사하고 다운로드 작업을 등록합니다. (job, error) 를 반환합니다."""
+    if not url:
+        return None, "URL을 입력하세요."
+    
+    # 플랫폼 감지
+    platform, icon, color = detect_platform(url)
+    logger.info(f"감지된 플랫폼: {platform}")
+    
+    # 이미 받아둔 영상이면 다운로드 없이 바로 완료
+    key = video_key(url)
+    store_key = content_key(key, option_profiles.get(platform).get('format'))
+    if store_key:
+        cached = content_store.lookup(store_key)
+        if cached:
+            logger.info(f"저장소에 있는 파일 사용: {cached}")
+            reaper.touch(cached)
+            return job_queue.add_finished(url, platform, cached, key), None
+    
+    if not key:
+        try:
+            return job_queue.submit(url, platform), None
+        except QueueFullError as e:
+            return None, str(e)
+    
+    # 같은 영상이 이미 다운로드 중이면 그 결과를 기다린다
+    flight, leader = inflight.join(key)
+    if not leader:
+        logger.info(f"진행 중인 다운로드에 합류: {key}")
+        job = job_queue.add_waiting(url, platform, key)
+        flight.add_done_callback(lambda f: job_queue.resolve(job, filename=f.result, error=f.error))
+        return job, None
+    
+    try:
+        return job_queue.submit(url, platform, key, flight), None
+    except QueueFullError as e:
+        inflight.finish(flight, error=e)
+        return None, str(e)
+
+def job_response(job):
+    """작업 상태 JSON에 조회용 URL을 덧붙입니다."""
+    data = job.to_dict()
+    data['status_url'] = f"/jobs/{job.id}"
+    data['file_url'] = f"/jobs/{job.id}/file"
+    data['streamable'] = bool(job.progressive and job.progressive.enabled and not job.progressive.error)
+    if data['streamable']:
+        data['stream_url'] = f"/jobs/{job.id}/stream"
+    return data
+
+@app.route('/', methods=['GET', 'POST'])
+def index():
+    if request.method == 'POST':
+        job, error = enqueue_download(request.form.get('url'))
+        if error:
+            return render_template_string(HTML_FORM, error=error)
+        if job.status == JOB_DONE:
+            return render_template_string(HTML_FORM, filename=job.filename)
+        return render_template_string(HTML_FORM, job_id=job.id)
+    return render_template_string(HTML_FORM)
+
+@app.route('/platform')
+def platform_info():
+    """입력 중인 URL의 플랫폼 미리보기 (다운로드와 같은 라우터로 판정)."""
+    platform, icon, color = detect_platform(request.args.get('url', ''))
+    return jsonify({'platform': platform, 'icon': icon, 'color': color})
+
+@app.route('/download', methods=['POST'])
+def download():
+    job, error = enqueue_download(request.form.get('url'))
+    if error:
+        status = 400 if not request.form.get('url') else 503
+        return jsonify({'error': error}), status
+    return jsonify(job_response(job)), 200 if job.status == JOB_DONE else 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': "작업을 찾을 수 없습니다."}), 404
+    return jsonify(job_response(job))
+
+@app.route('/jobs/<job_id>/file')
+def job_file(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': "작업을 찾을 수 없습니다."}), 404
+    if job.status != JOB_DONE:
+        return jsonify(job_response(job)), 409
+    return file(job.filename)
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """다운로드가 끝나기 전부터 받은 만큼 바로 전송합니다. (단일 mp4 포맷만)"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'error': "작업을 찾을 수 없습니다."}), 404
+    
+    # 추출이 끝나 쓰기가 시작될 때까지 잠시 기다린다
+    deadline = time.monotonic() + STREAM_WAIT
+    while time.monotonic() < deadline:
+        if job.status == JOB_DONE:
+            return file(job.filename)
+        if job.finished:
+            break
+        progressive = job.progressive
+        if progressive is not None:
+            if not progressive.enabled:
+                break
+            if progressive.wait_ready(min(1.0, max(0.0, deadline - time.monotonic()))):
+                headers = {'Content-Disposition': f'attachment; filename="{job.id}.mp4"'}
+                if progressive.total_bytes:
+                    headers['Content-Length'] = str(progressive.total_bytes)
+                try:
+                    stream = progressive.iter_bytes()
+                except FileNotFoundError:
+                    # 다운로드가 끝나 후처리/저장소 등록 중이면 파일이 옮겨졌을 수 있다. 완료를 기다린다
+                    time.sleep(0.2)
+                    continue
+                logger.info(f"다운로드 중 스트리밍 시작: {job.id}")
+                return Response(stream, mimetype='video/mp4', headers=headers)
         else:
-            raise Exception("다운로드를 완료할 수 없습니다.")
-        
-    except Exception as e:
-        error_msg = f"다운로드 실패: {str(e)}"
-        logger.error(error_msg)
-        return render_template_string(HTML_FORM, error=error_msg)
+            time.sleep(0.2)
+    return jsonify(job_response(job)), 409
+
+@app.route('/metrics')
+def metrics():
+    return jsonify({
+        'jobs': job_queue.stats(),
+        'metadata_cache': metadata_cache.stats(),
+        'content_store': content_store.stats(),
+        'inflight': inflight.stats(),
+        'reaper': reaper.stats(),
+        'postprocess': post_processor.stats(),
+        'ffmpeg_pool': ffmpeg_pool.stats(),
+        'profiles': option_profiles.stats(),
+        'ydl_pool': ydl_pool.stats(),
+        'cookies': cookie_store.stats(),
+        'fragments': fragment_budget.stats(),
+    })
+
+class TrackedFile(io.FileIO):
+    """닫힐 때 한 번 콜백을 호출하는 파일 객체. 응답 전송이 끝난 시점을 알기 위해 사용합니다."""
+    
+    def __init__(self, path, on_close):
+        super().__init__(path, 'rb')
+        self._on_close = on_close
+    
+    def close(self):
+        on_close, self._on_close = self._on_close, None
+        super().close()
+        if on_close:
+            on_close()
+
+def file_etag(filename, stat):
+    """저장소 키와 파일 크기/수정 시각으로 강한 ETag를 만듭니다."""
+    entry = content_store.entry_for(filename)
+    prefix = entry['key'][:32] if entry else 'f'
+    return f"{prefix}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
 
 @app.route('/file/<filename>')
 def file(filename):
+    # 다운로드 폴더 바로 아래의 파일만 보낸다 (저장소 색인 같은 숨김 파일, 상위 경로 제외)
+    if not filename or filename.startswith('.') or any(c in filename for c in ('/', '\\', '\0')):
+        return "파일이 존재하지 않습니다.", 404
     path = os.path.join(DOWNLOAD_FOLDER, filename)
-    if os.path.exists(path):
-        return send_file(path, as_attachment=True)
-    return "파일이 존재하지 않습니다.", 404
+    # 전송이 끝날 때까지 참조를 잡아 정리기가 지우지 않게 한다
+    content_store.acquire(filename)
+    try:
+        f = TrackedFile(path, lambda: content_store.release(filename))
+    except OSError:
+        # 없는 파일, 디렉터리 등 (열지 못했으므로 close로 해제되지 않음)
+        content_store.release(filename)
+        return "파일이 존재하지 않습니다.", 404
+    
+    try:
+        stat = os.fstat(f.fileno())
+        if app.config['USE_X_SENDFILE']:
+            # 앞단 웹서버가 직접 파일을 보낸다 (Range/조건부 요청도 웹서버가 처리)
+            data = None
+            f.close()
+        else:
+            # WSGI 서버의 file_wrapper 를 쓰면 gunicorn 등이 sendfile(2) 로 전송한다
+            data = wrap_file(request.environ, f)
+        response = Response(data, mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                            direct_passthrough=True)
+        if data is None:
+            response.headers['X-Sendfile'] = os.path.abspath(path)
+        response.headers.set('Content-Disposition', 'attachment', filename=filename)
+        response.headers['Accept-Ranges'] = 'bytes'
+        response.content_length = stat.st_size
+        response.last_modified = stat.st_mtime
+        response.set_etag(file_etag(filename, stat))
+        response.cache_control.public = True
+        response.cache_control.max_age = FILE_CACHE_MAX_AGE
+        # Range / If-Range / If-None-Match / If-Modified-Since 처리 (206, 304)
+        response.make_conditional(request.environ, accept_ranges=True, complete_length=stat.st_size)
+    except Exception:
+        f.close()
+        raise
+    reaper.touch(filename)
+    return response
 
 if __name__ == '__main__':
     # Render 환경 자동 감지
@@ -1,11 +1,14 @@
-from flask import Flask, render_template_string, request, send_file
+from flask import Flask, jsonify, render_template_string, request, send_file
 import yt_dlp
 import os
 import uuid
 import logging
 import re
-import requests
 import json
+import platforms
+from http_session import get_session
+from resumable import download_resumable
+from threads_scan import find_video_urls, iter_json_blobs, read_page
 
 app = Flask(__name__)
 
@@ -17,11 +20,10 @@ logger = logging.getLogger(__name__)
 DOWNLOAD_FOLDER = 'downloads'
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
-
+def download_threads_video(url, outtmpl):
     """Threads 비디오를 직접 다운로드합니다."""
-    import requests
-    import re
-    import json
+    # 페이지, Instagram API, 영상 요청이 keep-alive 연결을 함께 재사용
+    session = get_session()
     
     try:
         # 더 강력한 헤더 설정 (Threads 전용)
@@ -41,16 +43,15 @@ os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
             'DNT': '1',
         }
         
-        # Threads 페이지 가져오기
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
+        # Threads 페이지 가져오기 (조각 단위로 훑다가 확실한 비디오 URL이 나오면 나머지는 받지 않음)
+        with session.get(url, headers=headers, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            page = read_page(response)
         
         # 페이지에서 비디오 URL 찾기
-        page_content = response.text
-        logger.info(f"Threads 페이지 내용 길이: {len(page_content)}")
-        
-        # 페이지 내용 일부를 로그에 저장 (디버깅용)
-        logger.info(f"페이지 내용 일부: {page_content[:1000]}...")
+        page_content = page.text
+        logger.info(f"Threads 페이지 내용 길이: {len(page_content)}"
+                    f"{'' if page.complete else ' (비디오 URL 발견 후 중단)'}")
         
         # Instagram API를 직접 사용하는 방법 시도
         try:
@@ -70,123 +71,50 @@ os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
                 })
                 
                 logger.info(f"Instagram API 시도: {instagram_api_url}")
-                api_response = requests.get(instagram_api_url, headers=api_headers, timeout=10)
+                api_response = session.get(instagram_api_url, headers=api_headers, timeout=10)
                 
                 if api_response.status_code == 200:
                     api_data = api_response.json()
                     logger.info(f"Instagram API 응답: {api_data}")
                     
-                    # API 응답에서 비디오 URL 찾기
-                    if 'items' in api_data and len(api_data['items']) > 0:
-                        item = api_data['items'][0]
-                        if 'video_versions' in item and len(item['video_versions']) > 0:
-                            video_url = item['video_versions'][0]['url']
-                            logger.info(f"Instagram API에서 비디오 URL 발견: {video_url}")
-                            
-                            # 비디오 다운로드
-                            video_response = requests.get(video_url, headers=headers, stream=True, timeout=30)
-                            video_response.raise_for_status()
-                            
-                            # 파일 저장
-                            filename = outtmpl.replace('%(ext)s', 'mp4')
-                            with open(filename, 'wb') as f:
-                                for chunk in video_response.iter_content(chunk_size=8192):
-                                    if chunk:
-                                        f.write(chunk)
-                            
-                            logger.info(f"Threads 비디오 다운로드 완료: {filename}")
-                            return filename
+                    # API 응답에서 해상도가 가장 높은 비디오 URL 찾기
+                    items = api_data.get('items') or []
+                    found = find_video_urls(items[0]) if items else []
+                    if found:
+                        video_url = found[0].url
+                        logger.info(f"Instagram API에서 비디오 URL 발견: {video_url} ({found[0].width}x{found[0].height})")
+                        
+                        # 비디오 다운로드 (.part에 받고 끊기면 이어받음)
+                        filename = outtmpl.replace('%(ext)s', 'mp4')
+                        download_resumable(session, video_url, filename, headers=headers)
+                        
+                        logger.info(f"Threads 비디오 다운로드 완료: {filename}")
+                        return filename
         except Exception as api_error:
             logger.warning(f"Instagram API 시도 실패: {str(api_error)}")
         
         # 기존 방법들 시도
         # JSON 데이터 찾기 (Threads는 JSON 형태로 데이터를 저장)
-        json_patterns = [
-            r'<script[^>]*>window\.__INITIAL_STATE__\s*=\s*({[^<]+})</script>',
-            r'<script[^>]*>window\.__APOLLO_STATE__\s*=\s*({[^<]+})</script>',
-            r'<script[^>]*>window\.__NEXT_DATA__\s*=\s*({[^<]+})</script>',
-            r'"__INITIAL_STATE__":\s*({[^}]+})',
-            r'"__APOLLO_STATE__":\s*({[^}]+})',
-        ]
-        
         video_url = None
         
-        # JSON 데이터에서 비디오 URL 찾기
-        for pattern in json_patterns:
-            matches = re.findall(pattern, page_content, re.DOTALL)
-            for match in matches:
-                try:
-                    # JSON 파싱 시도
-                    json_data = json.loads(match)
-                    logger.info(f"JSON 데이터 발견: {type(json_data)}")
-                    
-                    # JSON에서 비디오 URL 찾기
-                    def find_video_url(obj):
-                        if isinstance(obj, dict):
-                            for key, value in obj.items():
-                                if isinstance(value, str) and ('.mp4' in value or 'cdninstagram' in value):
-                                    return value
-                                elif isinstance(value, (dict, list)):
-                                    result = find_video_url(value)
-                                    if result:
-                                        return result
-                        elif isinstance(obj, list):
-                            for item in obj:
-                                result = find_video_url(item)
-                                if result:
-                                    return result
-                        return None
-                    
-                    video_url = find_video_url(json_data)
-                    if video_url:
-                        break
-                except json.JSONDecodeError:
-                    continue
-            if video_url:
+        # JSON 데이터에서 해상도가 가장 높은 비디오 URL 찾기
+        for match in iter_json_blobs(page_content):
+            try:
+                # JSON 파싱 시도
+                json_data = json.loads(match)
+            except json.JSONDecodeError:
+                continue
+            logger.info(f"JSON 데이터 발견: {type(json_data)}")
+            found = find_video_urls(json_data)
+            if found:
+                video_url = found[0].url
                 break
         
-        # JSON에서 찾지 못했다면 일반 패턴으로 찾기
+        # JSON에서 찾지 못했다면 페이지를 읽으며 찾은 후보 중 점수가 가장 높은 것 사용
         if not video_url:
-            video_patterns = [
-                r'"video_url":"([^"]+\.mp4[^"]*)"',
-                r'"media_url":"([^"]+\.mp4[^"]*)"',
-                r'"url":"([^"]+\.mp4[^"]*)"',
-                r'"src":"([^"]+\.mp4[^"]*)"',
-                r'"contentUrl":"([^"]+\.mp4[^"]*)"',
-                r'"content_url":"([^"]+\.mp4[^"]*)"',
-                r'"playbackUrl":"([^"]+\.mp4[^"]*)"',
-                r'"playback_url":"([^"]+\.mp4[^"]*)"',
-                r'"streamUrl":"([^"]+\.mp4[^"]*)"',
-                r'"stream_url":"([^"]+\.mp4[^"]*)"',
-                r'"video_url":"([^"]+)"',
-                r'"media_url":"([^"]+)"',
-                r'"url":"([^"]+)"',
-                # 추가 패턴들
-                r'"video_url":"([^"]+cdninstagram[^"]*)"',
-                r'"media_url":"([^"]+cdninstagram[^"]*)"',
-                r'"url":"([^"]+cdninstagram[^"]*)"',
-                r'"src":"([^"]+cdninstagram[^"]*)"',
-                r'"contentUrl":"([^"]+cdninstagram[^"]*)"',
-                r'"content_url":"([^"]+cdninstagram[^"]*)"',
-                r'"playbackUrl":"([^"]+cdninstagram[^"]*)"',
-                r'"playback_url":"([^"]+cdninstagram[^"]*)"',
-                r'"streamUrl":"([^"]+cdninstagram[^"]*)"',
-                r'"stream_url":"([^"]+cdninstagram[^"]*)"',
-                # HTML 태그 패턴
-                r'<video[^>]+src="([^"]+\.mp4[^"]*)"',
-                r'<video[^>]+src="([^"]+cdninstagram[^"]*)"',
-                r'<source[^>]+src="([^"]+\.mp4[^"]*)"',
-                r'<source[^>]+src="([^"]+cdninstagram[^"]*)"',
-            ]
-            
-            for pattern in video_patterns:
-                matches = re.findall(pattern, page_content)
-                for match in matches:
-                    if '.mp4' in match or 'video' in match.lower() or 'cdninstagram' in match:
-                        video_url = match.replace('\\u0026', '&').replace('\\/', '/')
-                        break
-                if video_url:
-                    break
+            logger.info(f"비디오 URL 후보 {len(page.candidates)}개")
+            if page.candidates:
+                video_url = page.candidates[0]
         
         if not video_url:
             raise Exception("비디오 URL을 찾을 수 없습니다. Threads는 JavaScript 렌더링을 사용하므로 직접 다운로드가 어려울 수 있습니다.")
@@ -194,15 +122,9 @@ os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
         logger.info(f"Threads 비디오 URL 발견: {video_url}")
         
         # 비디오 다운로드
-        video_response = requests.get(video_url, headers=headers, stream=True, timeout=30)
-        video_response.raise_for_status()
-        
-        # 파일 저장
+        # .part에 받고 끊기면 받은 곳부터 이어받음
         filename = outtmpl.replace('%(ext)s', 'mp4')
-        with open(filename, 'wb') as f:
-            for chunk in video_response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
+        download_resumable(session, video_url, filename, headers=headers)
         
         logger.info(f"Threads 비디오 다운로드 완료: {filename}")
         return filename
@@ -211,114 +133,21 @@ os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
         logger.error(f"Threads 다운로드 실패: {str(e)}")
         raise e
 
-def normalize_threads_url(url):
-    """Threads URL을 정규화합니다."""
-    import re
-    
-    # Threads URL 패턴들
-    patterns = [
-        r'https?://(?:www\.)?threads\.net/@[^/]+/post/[^/]+',
-        r'https?://(?:www\.)?threads\.net/t/[^/]+',
-        r'https?://(?:www\.)?threads\.net/post/[^/]+',
-        r'https?://(?:www\.)?threads\.com/@[^/]+/post/[^/]+',
-        r'https?://(?:www\.)?threads\.com/t/[^/]+',
-        r'https?://(?:www\.)?threads\.com/post/[^/]+',
-    ]
-    
-    for pattern in patterns:
-        if re.match(pattern, url):
-            # URL 끝의 슬래시 제거
-            url = url.rstrip('/')
-            return url
-    
-    return url
-
-def normalize_facebook_url(url):
-    """Facebook URL을 정규화합니다."""
-    import re
-    
-    # Facebook URL 패턴들
-    patterns = [
-        r'https?://(?:www\.)?facebook\.com/[^/]+/videos/\d+',
-        r'https?://(?:www\.)?facebook\.com/video\.php\?v=\d+',
-        r'https?://(?:www\.)?facebook\.com/watch/\?v=\d+',
-        r'https?://(?:www\.)?facebook\.com/reel/\d+',
-        r'https?://(?:www\.)?facebook\.com/share/v/[^/?]+',
-        r'https?://(?:www\.)?fb\.com/[^/]+/videos/\d+',
-        r'https?://(?:www\.)?fb\.com/video\.php\?v=\d+',
-        r'https?://(?:www\.)?fb\.com/watch/\?v=\d+',
-        r'https?://(?:www\.)?fb\.com/reel/\d+',
-        r'https?://(?:www\.)?fb\.com/share/v/[^/?]+',
-    ]
-    
-    for pattern in patterns:
-        if re.match(pattern, url):
-            # URL 끝의 슬래시 제거
-            url = url.rstrip('/')
-            return url
-    
-    return url
-
-def normalize_twitter_url(url):
-    """Twitter/X URL을 정규화합니다."""
-    import re
-    
-    # Twitter/X URL 패턴들
-    patterns = [
-        r'https?://(?:www\.)?twitter\.com/[^/]+/status/\d+',
-        r'https?://(?:www\.)?x\.com/[^/]+/status/\d+',
-        r'https?://(?:www\.)?twitter\.com/i/status/\d+',
-        r'https?://(?:www\.)?x\.com/i/status/\d+',
-    ]
-    
-    for pattern in patterns:
-        if re.match(pattern, url):
-            # URL 끝의 슬래시 제거
-            url = url.rstrip('/')
-            return url
-    
-    return url
+def normalize_url(url):
+    """URL을 플랫폼별 정규 형태로 바꿉니다. 영상 URL이 아니면 그대로 반환합니다."""
+    return platforms.route(url).canonical_url
 
-def normalize_reddit_url(url):
-    """Reddit URL을 정규화합니다."""
-    import re
-    
-    # Reddit URL 패턴들
-    patterns = [
-        r'https?://(?:www\.)?reddit\.com/r/[^/]+/comments/[^/]+/[^/]+/?',
-        r'https?://(?:www\.)?reddit\.com/r/[^/]+/comments/[^/]+/?',
-        r'https?://v\.redd\.it/[^/]+',
-        r'https?://(?:www\.)?reddit\.com/gallery/[^/]+',
-    ]
-    
-    for pattern in patterns:
-        if re.match(pattern, url):
-            # URL 끝의 슬래시 제거
-            url = url.rstrip('/')
-            return url
-    
-    return url
+def convert_threads_to_instagram_url(url):
+    """Threads 게시물 URL을 같은 코드의 Instagram 게시물 URL로 바꿉니다. 바꿀 수 없으면 그대로 반환합니다."""
+    key = platforms.video_key(url)
+    if not key or key[0] != 'Threads':
+        return url
+    return f"https://www.instagram.com/p/{key[1]}/"
 
 def detect_platform(url):
     """URL에서 플랫폼을 감지합니다."""
-    url_lower = url.lower()
-    
-    if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-        return 'YouTube', 'fab fa-youtube', '#FF0000'
-    elif 'tiktok.com' in url_lower:
-        return 'TikTok', 'fab fa-tiktok', '#000000'
-    elif 'instagram.com' in url_lower or 'instagr.am' in url_lower:
-        return 'Instagram', 'fab fa-instagram', '#E4405F'
-    elif 'reddit.com' in url_lower or 'redd.it' in url_lower:
-        # Reddit URL 정규화
-        if '/comments/' in url_lower:
-            return 'Reddit', 'fab fa-reddit', '#FF4500'
-        else:
-            return 'Reddit', 'fab fa-reddit', '#FF4500'
-    elif 'twitter.com' in url_lower or 'x.com' in url_lower:
-        return 'Twitter/X', 'fab fa-twitter', '#1DA1F2'
-    else:
-        return 'Unknown', 'fas fa-video', '#666666'
+    route = platforms.route(url)
+    return route.platform, route.icon, route.color
 
 def get_platform_specific_options(platform):
     """플랫폼별 최적화된 다운로드 옵션을 반환합니다."""
@@ -842,52 +671,30 @@ HTML_FORM = '''
     </div>
     
     <script>
+      // 플랫폼 미리보기: 서버와 같은 라우터로 판정하도록 /platform 에 묻는다
+      let platformRequest = 0;
+      let platformTimer = null;
       document.getElementById('urlInput').addEventListener('input', function() {
-        const url = this.value;
-        if (url) {
-          // URL을 서버로 보내서 플랫폼 감지 (간단한 클라이언트 사이드 감지)
-          const urlLower = url.toLowerCase();
-          let platform = 'Unknown';
-          let icon = 'fas fa-video';
-          let color = '#666666';
-          
-          if (urlLower.includes('youtube.com') || urlLower.includes('youtu.be')) {
-            platform = 'YouTube';
-            icon = 'fab fa-youtube';
-            color = '#FF0000';
-          } else if (urlLower.includes('tiktok.com')) {
-            platform = 'TikTok';
-            icon = 'fab fa-tiktok';
-            color = '#000000';
-          } else if (urlLower.includes('instagram.com') || urlLower.includes('instagr.am')) {
-            platform = 'Instagram';
-            icon = 'fab fa-instagram';
-            color = '#E4405F';
-          } else if (urlLower.includes('threads.net') || urlLower.includes('threads.com')) {
-            platform = 'Threads';
-            icon = 'fas fa-thread';
-            color = '#000000';
-          } else if (urlLower.includes('reddit.com') || urlLower.includes('redd.it')) {
-            platform = 'Reddit';
-            icon = 'fab fa-reddit';
-            color = '#FF4500';
-          } else if (urlLower.includes('twitter.com') || urlLower.includes('x.com')) {
-            platform = 'Twitter/X';
-            icon = 'fab fa-twitter';
-            color = '#1DA1F2';
-          } else if (urlLower.includes('facebook.com') || urlLower.includes('fb.com')) {
-            platform = 'Facebook';
-            icon = 'fab fa-facebook';
-            color = '#1877F2';
-          }
-          
-          document.getElementById('platformName').textContent = platform;
-          document.getElementById('platformIcon').className = icon;
-          document.getElementById('platformIcon').style.color = color;
-          document.getElementById('platformInfo').classList.add('show');
-        } else {
+        const url = this.value.trim();
+        const requestId = ++platformRequest;
+        clearTimeout(platformTimer);
+        if (!url) {
           document.getElementById('platformInfo').classList.remove('show');
+          return;
         }
+        platformTimer = setTimeout(function() {
+          fetch('/platform?url=' + encodeURIComponent(url))
+            .then(function(res) { return res.json(); })
+            .then(function(info) {
+              // 더 최근 입력에 대한 응답이 이미 나갔으면 무시
+              if (requestId !== platformRequest) return;
+              document.getElementById('platformName').textContent = info.platform;
+              document.getElementById('platformIcon').className = info.icon;
+              document.getElementById('platformIcon').style.color = info.color;
+              document.getElementById('platformInfo').classList.add('show');
+            })
+            .catch(function() {});
+        }, 150);
       });
       
       document.getElementById('downloadForm').addEventListener('submit', function() {
@@ -904,6 +711,12 @@ HTML_FORM = '''
 def index():
     return render_template_string(HTML_FORM)
 
+@app.route('/platform')
+def platform_info():
+    """입력 중인 URL의 플랫폼 미리보기 (다운로드와 같은 라우터로 판정)."""
+    platform, icon, color = detect_platform(request.args.get('url', ''))
+    return jsonify({'platform': platform, 'icon': icon, 'color': color})
+
 @app.route('/download', methods=['POST'])
 def download():
     url = request.form.get('url')
@@ -914,30 +727,14 @@ def download():
     platform, icon, color = detect_platform(url)
     logger.info(f"감지된 플랫폼: {platform}")
     
-    # Reddit URL 정규화
-    if platform == 'Reddit':
-        original_url = url
-        url = normalize_reddit_url(url)
-        logger.info(f"Reddit URL 정규화: {original_url} -> {url}")
+    # URL 정규화 (youtu.be, shorts, 추적 파라미터 등을 같은 형태로)
+    original_url = url
+    url = normalize_url(url)
+    if url != original_url:
+        logger.info(f"{platform} URL 정규화: {original_url} -> {url}")
     
-    # Twitter/X URL 정규화
-    if platform == 'Twitter/X':
-        original_url = url
-        url = normalize_twitter_url(url)
-        logger.info(f"Twitter/X URL 정규화: {original_url} -> {url}")
-    
-    # Facebook URL 정규화
-    if platform == 'Facebook':
-        original_url = url
-        url = normalize_facebook_url(url)
-        logger.info(f"Facebook URL 정규화: {original_url} -> {url}")
-    
-    # Threads URL 정규화 및 직접 다운로드 우선 시도
+    # Threads 직접 다운로드 우선 시도
     if platform == 'Threads':
-        original_url = url
-        url = normalize_threads_url(url)
-        logger.info(f"Threads URL 정규화: {original_url} -> {url}")
-        
         # 먼저 Threads 직접 다운로드 시도
         try:
             logger.info("Threads 직접 다운로드 시도")
@@ -1,11 +1,17 @@
-from flask import Flask, render_template_string, request, send_file
-import yt_dlp
+from flask import Flask, jsonify, render_template_string, request, send_file
 import os
 import uuid
 import logging
 import re
 import requests
 import json
+from metadata_cache import MetadataCache, start_warm_up, video_key
+import platforms
+from profiles import ProfileRegistry
+from ydl_pool import YoutubeDLPool
+from cookie_store import CookieStore
+from fragments import FragmentBudget
+from postprocess import PostProcessor
 
 app = Flask(__name__)
 
@@ -17,25 +23,22 @@ logger = logging.getLogger(__name__)
 DOWNLOAD_FOLDER = 'downloads'
 os.makedirs(DOWNLOAD_FOLDER, exist_ok=True)
 
+# 영상 정보 캐시 (같은 영상의 반복 요청은 추출기를 다시 돌리지 않음)
+metadata_cache = MetadataCache(max_entries=int(os.environ.get('METADATA_CACHE_SIZE', 512)))
+
+# 처음 보는 사이트의 첫 요청이 추출기 로드를 기다리지 않도록 미리 준비
+start_warm_up()
+
 def detect_platform(url):
     """URL에서 플랫폼을 감지합니다."""
-    url_lower = url.lower()
-    
-    if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-        return 'YouTube', 'fab fa-youtube', '#FF0000'
-    elif 'tiktok.com' in url_lower:
-        return 'TikTok', 'fab fa-tiktok', '#000000'
-    elif 'instagram.com' in url_lower or 'instagr.am' in url_lower:
-        return 'Instagram', 'fab fa-instagram', '#E4405F'
-    elif 'reddit.com' in url_lower or 'redd.it' in url_lower:
-            return 'Reddit', 'fab fa-reddit', '#FF4500'
-    elif 'twitter.com' in url_lower or 'x.com' in url_lower:
-        return 'Twitter/X', 'fab fa-twitter', '#1DA1F2'
-    else:
-        return 'Unknown', 'fas fa-video', '#666666'
+    route = platforms.route(url)
+    return route.platform, route.icon, route.color
 
 def get_platform_specific_options(platform):
-    """플랫폼별 최적화된 다운로드 옵션을 반환합니다."""
+    """플랫폼별 최적화된 다운로드 옵션을 만듭니다.
+    
+    요청마다 호출하지 말고 option_profiles 로 조회합니다 (시작 시와 설정 파일 변경 시에만 호출됨).
+    """
     base_options = {
         'quiet': True,  # 더 조용하게
         'no_warnings': True,  # 경고 메시지 숨김
@@ -43,19 +46,20 @@ def get_platform_specific_options(platform):
         'ignoreerrors': False,
         'nocheckcertificate': True,
         'extractor_retries': 3,
+        'segment_connections': int(os.environ.get('DOWNLOAD_SEGMENTS', 4)),  # 단일 파일 분할 다운로드 연결 수
+        'concurrent_fragment_downloads': int(os.environ.get('FRAGMENT_CONCURRENCY', 4)),  # 작업당 HLS/DASH 동시 조각 수
+        'parallel_formats': os.environ.get('PARALLEL_FORMATS', '1') == '1',  # 영상/음성 포맷 동시 다운로드
     }
     
     if platform == 'TikTok':
         base_options.update({
             'format': 'best[ext=mp4]/best',
             'merge_output_format': 'mp4',
-            'cookiesfrombrowser': ('chrome',),
         })
     elif platform == 'Instagram':
         base_options.update({
             'format': 'best[ext=mp4]/best[height<=1080]/best',
             'merge_output_format': 'mp4',
-            'cookiesfrombrowser': ('chrome',),
             'extract_flat': False,
             'ignoreerrors': True,
             'extractor_retries': 5,
@@ -68,20 +72,14 @@ def get_platform_specific_options(platform):
             'ignoreerrors': True,
             'extractor_retries': 5,
             'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'cookiesfrombrowser': ('chrome',),
             'nocheckcertificate': True,
             'no_warnings': True,
             'quiet': True,
             'extractaudio': False,
             'audioformat': 'mp3',
             'audioquality': '0',
-            'recodevideo': 'mp4',
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }],
             'prefer_ffmpeg': True,
-            'keepvideo': True,
+            'keepvideo': False,  # 변환 전 원본은 남기지 않음
             'writesubtitles': False,
             'writeautomaticsub': False,
             'subtitleslangs': ['en'],
@@ -92,7 +90,6 @@ def get_platform_specific_options(platform):
         base_options.update({
             'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
             'merge_output_format': 'mp4',
-            'cookiesfrombrowser': ('chrome',),
             'extract_flat': False,
             'ignoreerrors': True,
             'extractor_retries': 5,
@@ -103,13 +100,8 @@ def get_platform_specific_options(platform):
             'extractaudio': False,
             'audioformat': 'mp3',
             'audioquality': '0',
-            'recodevideo': 'mp4',
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }],
             'prefer_ffmpeg': True,
-            'keepvideo': True,
+            'keepvideo': False,  # 변환 전 원본은 남기지 않음
             'writesubtitles': False,
             'writeautomaticsub': False,
             'subtitleslangs': ['en'],
@@ -123,13 +115,8 @@ def get_platform_specific_options(platform):
             'extractaudio': False,
             'audioformat': 'mp3',
             'audioquality': '0',
-            'recodevideo': 'mp4',
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }],
             'prefer_ffmpeg': True,
-            'keepvideo': True,
+            'keepvideo': False,  # 변환 전 원본은 남기지 않음
             'writesubtitles': False,
             'writeautomaticsub': False,
             'subtitleslangs': ['en'],
@@ -139,6 +126,33 @@ def get_platform_specific_options(platform):
     
     return base_options
 
+# 후처리 (코덱을 확인해 remux 또는 필요한 경우에만 재인코딩)
+post_processor = PostProcessor()
+
+# 플랫폼별 yt-dlp 옵션 템플릿 (PROFILE_CONFIG 파일이 바뀌면 자동으로 다시 읽음)
+option_profiles = ProfileRegistry(
+    get_platform_specific_options,
+    platforms.NAMES,
+    config_path=os.environ.get('PROFILE_CONFIG'),
+)
+
+# 쿠키 저장소 (쿠키 파일을 한 번 읽고, 파일이 바뀌면 다시 읽음)
+cookie_store = CookieStore(
+    path=os.environ.get('COOKIE_FILE'),
+    browser=os.environ.get('COOKIES_FROM_BROWSER'),
+)
+
+# 모든 작업이 함께 쓰는 HLS/DASH 동시 조각 수 예산
+fragment_budget = FragmentBudget(int(os.environ.get('FRAGMENT_BUDGET', 16)))
+
+# 프로필별 YoutubeDL 인스턴스 풀 (추출기/쿠키 초기화를 요청마다 반복하지 않음)
+ydl_pool = YoutubeDLPool(
+    option_profiles,
+    max_idle=int(os.environ.get('YDL_POOL_SIZE', 4)),
+    cookie_store=cookie_store,
+    fragment_budget=fragment_budget,
+)
+
 # HTML 템플릿 (app.py와 동일)
 HTML_FORM = '''
 <!DOCTYPE html>
@@ -394,44 +408,30 @@ HTML_FORM = '''
     </div>
     
     <script>
+      // 플랫폼 미리보기: 서버와 같은 라우터로 판정하도록 /platform 에 묻는다
+      let platformRequest = 0;
+      let platformTimer = null;
       document.getElementById('url').addEventListener('input', function() {
         const url = this.value.trim();
-        const urlLower = url.toLowerCase();
-        
-        if (url) {
-          let platform = 'Unknown';
-          let icon = 'fas fa-video';
-          let color = '#666666';
-          
-          if (urlLower.includes('youtube.com') || urlLower.includes('youtu.be')) {
-            platform = 'YouTube';
-            icon = 'fab fa-youtube';
-            color = '#FF0000';
-          } else if (urlLower.includes('tiktok.com')) {
-            platform = 'TikTok';
-            icon = 'fab fa-tiktok';
-            color = '#000000';
-          } else if (urlLower.includes('instagram.com') || urlLower.includes('instagr.am')) {
-            platform = 'Instagram';
-            icon = 'fab fa-instagram';
-            color = '#E4405F';
-          } else if (urlLower.includes('reddit.com') || urlLower.includes('redd.it')) {
-            platform = 'Reddit';
-            icon = 'fab fa-reddit';
-            color = '#FF4500';
-          } else if (urlLower.includes('twitter.com') || urlLower.includes('x.com')) {
-            platform = 'Twitter/X';
-            icon = 'fab fa-twitter';
-            color = '#1DA1F2';
-          }
-          
-          document.getElementById('platformName').textContent = platform;
-          document.getElementById('platformIcon').className = icon;
-          document.getElementById('platformIcon').style.color = color;
-          document.getElementById('platformInfo').classList.add('show');
-        } else {
+        const requestId = ++platformRequest;
+        clearTimeout(platformTimer);
+        if (!url) {
           document.getElementById('platformInfo').classList.remove('show');
+          return;
         }
+        platformTimer = setTimeout(function() {
+          fetch('/platform?url=' + encodeURIComponent(url))
+            .then(function(res) { return res.json(); })
+            .then(function(info) {
+              // 더 최근 입력에 대한 응답이 이미 나갔으면 무시
+              if (requestId !== platformRequest) return;
+              document.getElementById('platformName').textContent = info.platform;
+              document.getElementById('platformIcon').className = info.icon;
+              document.getElementById('platformIcon').style.color = info.color;
+              document.getElementById('platformInfo').classList.add('show');
+            })
+            .catch(function() {});
+        }, 150);
       });
       
       document.getElementById('downloadForm').addEventListener('submit', function() {
@@ -444,12 +444,25 @@ HTML_FORM = '''
 </html>
 '''
 
+def downloaded_filepath(ydl, info):
+    """process_ie_result 결과에서 최종 파일 경로를 찾습니다."""
+    for download in info.get('requested_downloads') or []:
+        if download.get('filepath'):
+            return download['filepath']
+    return ydl.prepare_filename(info)
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         return download()
     return render_template_string(HTML_FORM)
 
+@app.route('/platform')
+def platform_info():
+    """입력 중인 URL의 플랫폼 미리보기 (다운로드와 같은 라우터로 판정)."""
+    platform, icon, color = detect_platform(request.args.get('url', ''))
+    return jsonify({'platform': platform, 'icon': icon, 'color': color})
+
 @app.route('/download', methods=['POST'])
 def download():
     url = request.form.get('url')
@@ -463,42 +476,45 @@ def download():
     # 고유 파일명 생성
     outtmpl = os.path.join(DOWNLOAD_FOLDER, f"{uuid.uuid4()}.%(ext)s")
     
-    # 플랫폼별 최적화된 옵션 가져오기
-    ydl_opts = get_platform_specific_options(platform)
-    ydl_opts['outtmpl'] = outtmpl
+    cache_key = video_key(url)
     
     try:
         logger.info(f"다운로드 시작: {url} (플랫폼: {platform})")
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        # 미리 만들어 둔 플랫폼별 YoutubeDL을 빌려 outtmpl만 바꿔 사용
+        with ydl_pool.checkout(platform, outtmpl=outtmpl) as ydl:
             # 먼저 정보만 추출해서 영상이 접근 가능한지 확인
             try:
-                logger.info("영상 정보 추출 시작...")
-                info = ydl.extract_info(url, download=False)
+                info = metadata_cache.get(cache_key)
                 if not info:
-                    raise Exception("영상 정보를 가져올 수 없습니다. 링크를 확인해주세요.")
+                    logger.info("영상 정보 추출 시작...")
+                    info = ydl.extract_info(url, download=False)
+                    if not info:
+                        raise Exception("영상 정보를 가져올 수 없습니다. 링크를 확인해주세요.")
+                    metadata_cache.put(cache_key, info, platform)
                 
                 title = info.get('title', 'Unknown')
                 duration = info.get('duration', 'Unknown')
                 logger.info(f"영상 제목: {title}, 길이: {duration}초")
                 
-                # 실제 다운로드 실행
+                # 실제 다운로드 실행 (추출 결과를 재사용해 추출기를 다시 돌리지 않음)
                 logger.info("실제 다운로드 시작...")
-                ydl.download([url])
+                info = ydl.process_ie_result(info, download=True)
                 
                 # 다운로드된 파일 찾기
-                filename = ydl.prepare_filename(info)
+                filename = downloaded_filepath(ydl, info)
                 if not filename or not os.path.exists(filename):
                     # UUID 기반 파일명으로 대체
                     filename = os.path.join(DOWNLOAD_FOLDER, f"{uuid.uuid4()}.mp4")
-                
-                if not filename.endswith('.mp4'):
-                    filename = os.path.splitext(filename)[0] + '.mp4'
+                else:
+                    # mp4로 맞추기 (코덱을 확인해 가능하면 재인코딩 없이 remux)
+                    filename, _ = post_processor.process(filename)
                 
                 base = os.path.basename(filename)
                 logger.info(f"다운로드 완료: {base}")
                 
             except Exception as extract_error:
+                metadata_cache.invalidate(cache_key)
                 logger.error(f"영상 정보 추출 실패: {str(extract_error)}")
                 raise Exception(f"영상 정보를 가져올 수 없습니다: {str(extract_error)}")
             
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+직접 다운로드 쓰기 루프 벤치마크
+로컬 Range 서버에서 기존 download_video 루프(iter_content 8KB + 조각마다 진행률 출력)와
+resumable.download_resumable(readinto + 속도에 맞춘 읽기 크기 + 시간 간격 진행률)을 비교합니다.
+CPU 시간은 받는 스레드만 측정하므로(time.thread_time) 같은 프로세스의 서버 스레드는 포함되지 않습니다.
+
+사용법: python3 benchmarks/bench_chunked_write.py [--size-mb 256] [--rate-mb 0] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from http_session import make_session
+from range_server import RangeServer
+from resumable import download_resumable
+
+
+def show_progress(downloaded, total_size):
+    """threads_downloader.download_video의 진행률 출력과 같은 형식."""
+    if total_size > 0:
+        print(f"\r진행률: {(downloaded / total_size) * 100:.1f}%", end='', flush=True)
+
+
+def legacy_download(session, url, path):
+    """기존 fetch_video 루프 (비교용). (받은 바이트, 반복 횟수)를 반환합니다."""
+    iterations = 0
+    with session.get(url, stream=True) as response:
+        response.raise_for_status()
+        total_size = int(response.headers.get('content-length', 0))
+        with open(path, 'wb') as f:
+            downloaded = 0
+            for chunk in response.iter_content(chunk_size=8192):
+                if chunk:
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    iterations += 1
+                    show_progress(downloaded, total_size)
+    return downloaded, iterations
+
+
+def resumable_download(session, url, path):
+    calls = []
+
+    def progress(downloaded, total_size):
+        calls.append(downloaded)
+        show_progress(downloaded, total_size)
+
+    return download_resumable(session, url, path, progress=progress), len(calls)
+
+
+def measure(func, session, url, folder, repeat):
+    """(벽시계 초, 받는 스레드 CPU 초, 진행률 호출/반복 횟수, sha256) 중 가장 빠른 회차를 반환합니다."""
+    best = None
+    for index in range(repeat):
+        path = os.path.join(folder, f"{func.__name__}-{index}.mp4")
+        sink = io.StringIO()
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        with redirect_stdout(sink):
+            _, count = func(session, url, path)
+        elapsed, cpu = time.perf_counter() - start, time.thread_time() - cpu_start
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        os.remove(path)
+        if best is None or cpu < best[1]:
+            best = (elapsed, cpu, count, digest)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--rate-mb', type=float, default=0, help='연결당 속도 제한 (MB/s, 0이면 제한 없음)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    payload = os.urandom(size)
+    expected = hashlib.sha256(payload).hexdigest()
+    rate = int(args.rate_mb * 1024 * 1024) if args.rate_mb else None
+    gigabytes = size / 1024 ** 3
+
+    print(f"파일 {args.size_mb}MB, 연결당 {args.rate_mb or '제한 없음'}{'MB/s' if args.rate_mb else ''}")
+    print(f"{'방식':<12} {'시간(s)':>8} {'MB/s':>8} {'CPU(s)':>8} {'CPU s/GB':>9} {'콜백/반복':>9}  결과")
+    with RangeServer(payload, rate=rate) as server, tempfile.TemporaryDirectory() as folder:
+        session = make_session()
+        results = {}
+        for name, func in (('기존 8KB', legacy_download), ('readinto', resumable_download)):
+            elapsed, cpu, count, digest = measure(func, session, server.url, folder, args.repeat)
+            results[name] = cpu
+            print(f"{name:<12} {elapsed:>8.2f} {args.size_mb / elapsed:>8.1f} {cpu:>8.2f} "
+                  f"{cpu / gigabytes:>9.2f} {count:>9}  {'일치' if digest == expected else '불일치'}")
+    print(f"\nGB당 CPU {results['기존 8KB'] / results['readinto']:.1f}배 감소")
+
+
+if __name__ == '__main__':
+    main()
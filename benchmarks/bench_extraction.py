@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+작업당 추출기 HTTP 요청 수 벤치마크
+extract_info + download([url]) (기존 방식) 과 extract_info + process_ie_result (단일 추출) 을 비교합니다.
+
+사용법: python3 benchmarks/bench_extraction.py [URL ...]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import yt_dlp
+
+from app import detect_platform, get_platform_specific_options
+
+DEFAULT_URLS = [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+]
+
+
+class CountingYoutubeDL(yt_dlp.YoutubeDL):
+    """urlopen 호출 수를 셉니다."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.request_count = 0
+
+    def urlopen(self, req):
+        self.request_count += 1
+        return super().urlopen(req)
+
+
+def run(url, single_extraction):
+    platform = detect_platform(url)[0]
+    ydl_opts = get_platform_specific_options(platform)
+    ydl_opts.update({
+        'skip_download': True,  # 미디어 전송은 제외하고 추출기 요청만 센다
+        'quiet': True,
+        'no_warnings': True,
+        'cookiesfrombrowser': None,
+    })
+    start = time.perf_counter()
+    with CountingYoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        if single_extraction:
+            ydl.process_ie_result(info, download=True)
+        else:
+            ydl.download([url])
+        return ydl.request_count, time.perf_counter() - start
+
+
+def main():
+    urls = sys.argv[1:] or DEFAULT_URLS
+    print(f"{'모드':<12} {'요청 수':>8} {'시간(s)':>8}  URL")
+    for url in urls:
+        for label, single in (('기존', False), ('단일 추출', True)):
+            try:
+                count, elapsed = run(url, single)
+                print(f"{label:<12} {count:>8} {elapsed:>8.2f}  {url}")
+            except Exception as e:
+                print(f"{label:<12} {'-':>8} {'-':>8}  {url} ({str(e)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+플랫폼 감지 마이크로 벤치마크
+기존 if/elif 부분 문자열 검사와 platforms.route (호스트 접미사 색인 + 컴파일된 경로 패턴)를
+여러 플랫폼이 섞인 URL 코퍼스에서 비교하고, 두 방식의 판정이 다른 URL을 보여줍니다.
+route는 정규화 URL과 영상 ID까지 구하므로 처음 보는 URL은 부분 문자열 검사보다 느립니다
+(URL당 수 us). 같은 URL의 반복 조회는 캐시에서 돌려줍니다.
+
+사용법: python3 benchmarks/bench_router.py [URL 개수]
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import platforms
+
+
+def legacy_detect_platform(url):
+    """기존 app.py의 detect_platform (비교용)."""
+    url_lower = url.lower()
+
+    if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
+        return 'YouTube', 'fab fa-youtube', '#FF0000'
+    elif 'tiktok.com' in url_lower:
+        return 'TikTok', 'fab fa-tiktok', '#000000'
+    elif 'instagram.com' in url_lower or 'instagr.am' in url_lower:
+        return 'Instagram', 'fab fa-instagram', '#E4405F'
+    elif 'reddit.com' in url_lower or 'redd.it' in url_lower:
+        return 'Reddit', 'fab fa-reddit', '#FF4500'
+    elif 'twitter.com' in url_lower or 'x.com' in url_lower:
+        return 'Twitter/X', 'fab fa-twitter', '#1DA1F2'
+    elif 'threads.net' in url_lower:
+        return 'Threads', 'fab fa-threads', '#000000'
+    else:
+        return 'Unknown', 'fas fa-video', '#666666'
+
+
+def _token(rng, length, alphabet=string.ascii_letters + string.digits + '_-'):
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+TEMPLATES = [
+    lambda r: f"https://www.youtube.com/watch?v={_token(r, 11)}&t={r.randint(1, 600)}",
+    lambda r: f"https://youtu.be/{_token(r, 11)}",
+    lambda r: f"https://m.youtube.com/shorts/{_token(r, 11)}",
+    lambda r: f"https://www.tiktok.com/@{_token(r, 8, string.ascii_lowercase)}/video/{r.randint(10**18, 10**19)}",
+    lambda r: f"https://www.instagram.com/reel/{_token(r, 11)}/",
+    lambda r: f"https://www.reddit.com/r/videos/comments/{_token(r, 6, string.ascii_lowercase)}/some_title/",
+    lambda r: f"https://v.redd.it/{_token(r, 13, string.ascii_lowercase + string.digits)}",
+    lambda r: f"https://x.com/{_token(r, 8, string.ascii_letters)}/status/{r.randint(10**18, 10**19)}?s=20",
+    lambda r: f"https://twitter.com/i/status/{r.randint(10**18, 10**19)}",
+    lambda r: f"https://x.com/{_token(r, 8, string.ascii_letters)}/status/{r.randint(10**18, 10**19)}/video/{r.randint(1, 4)}",
+    lambda r: f"https://www.threads.net/@{_token(r, 8, string.ascii_lowercase)}/post/{_token(r, 11)}",
+    lambda r: f"https://www.facebook.com/watch/?v={r.randint(10**14, 10**15)}",
+    # 기존 방식이 잘못 판정하던 URL
+    lambda r: f"https://www.netflix.com/watch/{r.randint(10**7, 10**8)}",
+    lambda r: f"https://box.com/s/{_token(r, 20)}",
+    lambda r: f"https://example.com/?next=youtube.com/{_token(r, 11)}",
+]
+
+
+# (URL, 기대하는 video_key): 형태가 달라도 같은 영상은 같은 키, 다른 영상은 다른 키
+KEY_CASES = [
+    ('https://youtu.be/dQw4w9WgXcQ', ('YouTube', 'dQw4w9WgXcQ')),
+    ('https://www.youtube.com/shorts/dQw4w9WgXcQ', ('YouTube', 'dQw4w9WgXcQ')),
+    ('https://x.com/user/status/1234567890', ('Twitter/X', '1234567890')),
+    ('https://twitter.com/i/status/1234567890?s=20', ('Twitter/X', '1234567890')),
+    ('https://x.com/user/status/1234567890/video/1', ('Twitter/X', '1234567890/video/1')),
+    ('https://x.com/user/status/1234567890/video/2', ('Twitter/X', '1234567890/video/2')),
+    ('https://www.netflix.com/watch/81234567', None),
+]
+
+
+def make_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(TEMPLATES)(rng) for _ in range(count)]
+
+
+def timed(fn, corpus):
+    start = time.perf_counter()
+    for url in corpus:
+        fn(url)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    corpus = make_corpus(count)
+
+    legacy = timed(legacy_detect_platform, corpus)
+    # 캐시 없이 매번 파싱하는 비용 (모두 다른 URL)
+    routed = timed(platforms.route.__wrapped__, corpus)
+    # 같은 URL을 여러 번 조회하는 경우 (요청 하나에서 detect_platform, video_key 등이 같은 URL 조회)
+    platforms.route.cache_clear()
+    repeated = [url for url in corpus[:platforms.ROUTE_CACHE_SIZE // 2] for _ in range(4)]
+    cached = timed(platforms.route, repeated)
+    print(f"URL {count:,}개")
+    print(f"{'방식':<24} {'총 시간(s)':>10} {'URL당(us)':>10}")
+    print(f"{'if/elif 부분 문자열':<24} {legacy:>10.3f} {legacy / count * 1e6:>10.2f}")
+    print(f"{'platforms.route':<24} {routed:>10.3f} {routed / count * 1e6:>10.2f}  (정규화 URL, 영상 ID 포함)")
+    print(f"{'route (URL당 4회 조회)':<24} {cached:>10.3f} {cached / len(repeated) * 1e6:>10.2f}  (첫 조회 후 캐시)")
+
+    differences = {}
+    for url in corpus:
+        old = legacy_detect_platform(url)[0]
+        new = platforms.route(url).platform
+        if old != new:
+            differences.setdefault((old, new), url)
+    if differences:
+        print("\n판정이 다른 URL (예시):")
+        for (old, new), url in sorted(differences.items()):
+            print(f"  {old:<10} -> {new:<10} {url}")
+
+    wrong = [(url, expected, platforms.video_key(url)) for url, expected in KEY_CASES
+             if platforms.video_key(url) != expected]
+    print(f"\nvideo_key 확인: {len(KEY_CASES) - len(wrong)}/{len(KEY_CASES)}")
+    for url, expected, got in wrong:
+        print(f"  {url}: 기대 {expected}, 결과 {got}")
+
+
+if __name__ == '__main__':
+    main()
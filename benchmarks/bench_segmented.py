@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+분할 다운로드 벤치마크
+연결당 속도를 제한한 로컬 Range 서버에서 yt-dlp 기본 HTTP 다운로더(한 연결)와
+SegmentedFD(N개 연결)를 비교하고, 받은 파일이 원본과 같은지 확인합니다.
+--fail-every를 주면 일부 응답이 도중에 끊기며, 실패한 구간만 다시 받는지 볼 수 있습니다.
+
+사용법: python3 benchmarks/bench_segmented.py [--size-mb 64] [--rate-mb 8] [--connections 2,4,8] [--fail-every 5]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import yt_dlp
+from yt_dlp.downloader.http import HttpFD
+
+from range_server import RangeServer
+from segmented import SegmentedFD
+
+
+def run(fd_class, url, size, connections, folder):
+    params = {
+        'quiet': True,
+        'noprogress': True,
+        'retries': 10,
+        'segment_connections': connections,
+        'http_chunk_size': 10485760,
+    }
+    filename = os.path.join(folder, f"{fd_class.__name__}-{connections}.mp4")
+    info = {'url': url, 'ext': 'mp4', 'protocol': 'http', 'http_headers': {}, 'filesize': size}
+    with yt_dlp.YoutubeDL(params) as ydl:
+        start = time.perf_counter()
+        ok, _ = fd_class(ydl, params).download(filename, info)
+        elapsed = time.perf_counter() - start
+    with open(filename, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    os.remove(filename)
+    return ok, elapsed, digest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--rate-mb', type=float, default=8, help='연결당 속도 제한 (MB/s)')
+    parser.add_argument('--connections', default='2,4,8')
+    parser.add_argument('--fail-every', type=int, default=0, help='n번째 요청마다 응답 도중 연결 끊기')
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    payload = os.urandom(size)
+    expected = hashlib.sha256(payload).hexdigest()
+    rate = int(args.rate_mb * 1024 * 1024) if args.rate_mb else None
+
+    print(f"파일 {args.size_mb}MB, 연결당 {args.rate_mb}MB/s"
+          + (f", {args.fail_every}번째 요청마다 끊김" if args.fail_every else ""))
+    print(f"{'다운로더':<20} {'시간(s)':>8} {'MB/s':>8} {'요청 수':>8} {'끊김':>6}  결과")
+    cases = [(HttpFD, 1)] + [(SegmentedFD, int(n)) for n in args.connections.split(',')]
+    with tempfile.TemporaryDirectory() as folder:
+        for fd_class, connections in cases:
+            with RangeServer(payload, rate=rate, fail_every=args.fail_every) as server:
+                ok, elapsed, digest = run(fd_class, server.url, size, connections, folder)
+                label = 'HttpFD (기존)' if fd_class is HttpFD else f'SegmentedFD x{connections}'
+                result = '일치' if ok and digest == expected else '불일치'
+                print(f"{label:<20} {elapsed:>8.2f} {args.size_mb / elapsed:>8.1f} "
+                      f"{server.requests:>8} {server.failures:>6}  {result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+상태 JSON 영상 URL 탐색 벤치마크
+기존 download_threads_video의 재귀 find_video_url(모든 문자열을 검사해 처음 나온 .mp4/cdninstagram 반환)과
+threads_scan.find_video_urls(명시적 스택, 미디어 키만 확인, 해상도 순 정렬)를 비교합니다.
+아주 깊은 구조에서 재귀 방식이 RecursionError로 실패하는지도 확인합니다.
+
+사용법: python3 benchmarks/bench_state_json.py [--posts 2000] [--repeat 10] [저장한 상태 JSON 파일 ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from threads_fixture import make_state
+from threads_scan import find_video_urls
+
+
+def legacy_find_video_url(obj):
+    """기존 app_backup.py의 find_video_url (비교용)."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, str) and ('.mp4' in value or 'cdninstagram' in value):
+                return value
+            elif isinstance(value, (dict, list)):
+                result = legacy_find_video_url(value)
+                if result:
+                    return result
+    elif isinstance(obj, list):
+        for item in obj:
+            result = legacy_find_video_url(item)
+            if result:
+                return result
+    return None
+
+
+def walker(data):
+    found = find_video_urls(data)
+    return found[0].url if found else None
+
+
+def measure(func, data, repeat):
+    try:
+        result = func(data)
+    except RecursionError:
+        return None, 'RecursionError'
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(data)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('states', nargs='*', help='저장해 둔 상태 JSON 파일 (없으면 생성한 상태 사용)')
+    parser.add_argument('--posts', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    cases = []
+    if args.states:
+        for path in args.states:
+            with open(path, encoding='utf-8') as f:
+                cases.append((os.path.basename(path), json.load(f), None))
+    else:
+        for video_at in (0.1, 0.9):
+            state, url = make_state(0, args.posts, video_at)
+            cases.append((f'게시물 {args.posts}개, 영상 위치 {video_at:.0%}', state, url))
+        state, url = make_state(1, 50, 0.5, depth=sys.getrecursionlimit())
+        cases.append((f'깊이 {sys.getrecursionlimit() * 2}', state, url))
+
+    print(f"{'상태 JSON':<28} {'기존(ms)':>10} {'탐색기(ms)':>10}  결과")
+    for name, data, expected in cases:
+        legacy_time, legacy_url = measure(legacy_find_video_url, data, args.repeat)
+        walk_time, walk_url = measure(walker, data, args.repeat)
+
+        def verdict(found):
+            if expected is None:
+                return found
+            return '정답' if found == expected else ('실패' if found == 'RecursionError' else '오답')
+
+        legacy_ms = f'{legacy_time * 1000:>10.2f}' if legacy_time is not None else f"{'-':>10}"
+        print(f"{name:<28} {legacy_ms} {walk_time * 1000:>10.2f}  "
+              f"기존 {verdict(legacy_url)}, 탐색기 {verdict(walk_url)}")
+
+
+if __name__ == '__main__':
+    main()
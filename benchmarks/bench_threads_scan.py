@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Threads 페이지 영상 URL 추출 벤치마크
+기존 download_threads_video의 정규식 목록(패턴마다 페이지 전체를 re.findall)과
+threads_scan.scan_video_urls(한 번만 훑는 결합 정규식 + 점수), 그리고 read_page처럼
+16KB 조각으로 훑다가 확실한 후보가 나오면 멈추는 StreamScanner를 비교하고
+두 방식이 고른 URL을 보여줍니다.
+
+사용법: python3 benchmarks/bench_threads_scan.py [--size-kb 400] [--repeat 20] [저장한 HTML 파일 ...]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from threads_fixture import load_pages, make_page
+from threads_scan import CHUNK_SIZE, CONFIDENT_SCORE, StreamScanner, scan_video_urls
+
+LEGACY_VIDEO_PATTERNS = [
+    r'"video_url":"([^"]+\.mp4[^"]*)"',
+    r'"media_url":"([^"]+\.mp4[^"]*)"',
+    r'"url":"([^"]+\.mp4[^"]*)"',
+    r'"src":"([^"]+\.mp4[^"]*)"',
+    r'"contentUrl":"([^"]+\.mp4[^"]*)"',
+    r'"content_url":"([^"]+\.mp4[^"]*)"',
+    r'"playbackUrl":"([^"]+\.mp4[^"]*)"',
+    r'"playback_url":"([^"]+\.mp4[^"]*)"',
+    r'"streamUrl":"([^"]+\.mp4[^"]*)"',
+    r'"stream_url":"([^"]+\.mp4[^"]*)"',
+    r'"video_url":"([^"]+)"',
+    r'"media_url":"([^"]+)"',
+    r'"url":"([^"]+)"',
+    r'"video_url":"([^"]+cdninstagram[^"]*)"',
+    r'"media_url":"([^"]+cdninstagram[^"]*)"',
+    r'"url":"([^"]+cdninstagram[^"]*)"',
+    r'"src":"([^"]+cdninstagram[^"]*)"',
+    r'"contentUrl":"([^"]+cdninstagram[^"]*)"',
+    r'"content_url":"([^"]+cdninstagram[^"]*)"',
+    r'"playbackUrl":"([^"]+cdninstagram[^"]*)"',
+    r'"playback_url":"([^"]+cdninstagram[^"]*)"',
+    r'"streamUrl":"([^"]+cdninstagram[^"]*)"',
+    r'"stream_url":"([^"]+cdninstagram[^"]*)"',
+    r'<video[^>]+src="([^"]+\.mp4[^"]*)"',
+    r'<video[^>]+src="([^"]+cdninstagram[^"]*)"',
+    r'<source[^>]+src="([^"]+\.mp4[^"]*)"',
+    r'<source[^>]+src="([^"]+cdninstagram[^"]*)"',
+]
+
+
+def legacy_scan(page):
+    """기존 app_backup.py의 패턴 순회 (비교용)."""
+    for pattern in LEGACY_VIDEO_PATTERNS:
+        for match in re.findall(pattern, page):
+            if '.mp4' in match or 'video' in match.lower() or 'cdninstagram' in match:
+                return match.replace('\\u0026', '&').replace('\\/', '/')
+    return None
+
+
+def scanner(page):
+    candidates = scan_video_urls(page)
+    return candidates[0] if candidates else None
+
+
+def streaming(page):
+    """read_page와 같은 방식 (조각 단위, 확실한 후보가 나오면 중단)."""
+    scanner = StreamScanner(CONFIDENT_SCORE)
+    for start in range(0, len(page), CHUNK_SIZE):
+        if scanner.feed(page[start:start + CHUNK_SIZE]):
+            break
+    candidates = scanner.candidates()
+    return candidates[0] if candidates else None
+
+
+def measure(func, page, repeat):
+    result = func(page)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(page)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='*', help='저장해 둔 Threads HTML 파일 (없으면 생성한 페이지 사용)')
+    parser.add_argument('--size-kb', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [(name, page, False, None) for name, page in load_pages(args.pages)]
+    else:
+        pages = []
+        for seed, video_at in enumerate((0.1, 0.5, 0.9)):
+            page, url = make_page(seed, args.size_kb, video_at)
+            pages.append((f'생성 {len(page) // 1024}KB, 영상 위치 {video_at:.0%}', page, True, url))
+        # 영상이 없는 페이지 (이미지 URL을 영상으로 고르지 않아야 함)
+        page, _ = make_page(3, args.size_kb, video_at=2)
+        pages.append((f'생성 {len(page) // 1024}KB, 영상 없음', page, True, None))
+        # .mp4가 아닌 스트림 URL만 있는 페이지
+        page, url = make_page(4, args.size_kb, 0.9)
+        page = page.replace('.mp4', '.m3u8').replace('"url":"' + url.replace('/', '\\/').replace('.mp4', '.m3u8'),
+                                                   '"playback_url":"' + url.replace('/', '\\/').replace('.mp4', '.m3u8'))
+        pages.append((f'생성 {len(page) // 1024}KB, m3u8', page, True, url.replace('.mp4', '.m3u8')))
+
+    print(f"{'페이지':<32} {'기존(ms)':>10} {'스캐너(ms)':>10} {'배속':>6} {'조각(ms)':>10} {'배속':>6}  결과")
+    for name, page, known, expected in pages:
+        legacy_time, legacy_url = measure(legacy_scan, page, args.repeat)
+        scan_time, scan_url = measure(scanner, page, args.repeat)
+        stream_time, stream_url = measure(streaming, page, args.repeat)
+        if stream_url != scan_url:
+            print(f"  조각 단위 결과가 다릅니다: {stream_url}")
+        if not known:
+            result = '같음' if legacy_url == scan_url else f'다름\n  기존: {legacy_url}\n  스캐너: {scan_url}'
+        else:
+            result = f"기존 {'정답' if legacy_url == expected else '오답'}, 스캐너 {'정답' if scan_url == expected else '오답'}"
+        print(f"{name:<32} {legacy_time * 1000:>10.2f} {scan_time * 1000:>10.2f} "
+              f"{legacy_time / scan_time:>6.1f} {stream_time * 1000:>10.2f} {legacy_time / stream_time:>6.1f}  {result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+요청당 YoutubeDL 준비 비용 벤치마크
+매번 yt_dlp.YoutubeDL(옵션)을 새로 만드는 방식(기존)과 YoutubeDLPool에서 빌리는 방식을 비교합니다.
+각 요청은 실제 작업처럼 추출기 인스턴스, 쿠키 저장소, HTTP 핸들러를 준비합니다 (네트워크 요청 없음).
+
+사용법: python3 benchmarks/bench_ydl_setup.py [요청 수] [플랫폼] [--cookies-from-browser chrome]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import yt_dlp
+
+import platforms
+from profiles import ProfileRegistry
+from ydl_pool import YoutubeDLPool
+
+# 플랫폼별로 실제 요청에서 쓰이는 추출기
+EXTRACTORS = {
+    'YouTube': 'Youtube',
+    'TikTok': 'TikTok',
+    'Instagram': 'Instagram',
+    'Reddit': 'Reddit',
+    'Twitter/X': 'Twitter',
+}
+
+
+def build_options(browser):
+    def builder(platform):
+        options = {'quiet': True, 'no_warnings': True, 'format': 'best[ext=mp4]/best'}
+        if browser:
+            options['cookiesfrombrowser'] = (browser,)
+        return options
+    return builder
+
+
+def prepare(ydl, ie_key):
+    """다운로드 전에 yt-dlp가 준비하는 것들을 만들어 둡니다."""
+    ydl.get_info_extractor(ie_key)
+    ydl.cookiejar
+    ydl._request_director
+
+
+def fresh(registry, platform, ie_key, outtmpl):
+    with yt_dlp.YoutubeDL(registry.options(platform, outtmpl=outtmpl)) as ydl:
+        prepare(ydl, ie_key)
+
+
+def pooled(pool, platform, ie_key, outtmpl):
+    with pool.checkout(platform, outtmpl=outtmpl) as ydl:
+        prepare(ydl, ie_key)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('count', nargs='?', type=int, default=200)
+    parser.add_argument('platform', nargs='?', default='YouTube', choices=sorted(EXTRACTORS))
+    parser.add_argument('--cookies-from-browser', dest='browser')
+    args = parser.parse_args()
+
+    registry = ProfileRegistry(build_options(args.browser), platforms.NAMES)
+    pool = YoutubeDLPool(registry)
+    ie_key = EXTRACTORS[args.platform]
+
+    print(f"{args.platform}, 요청 {args.count}회" + (f", 브라우저 쿠키: {args.browser}" if args.browser else ""))
+    print(f"{'방식':<16} {'총 시간(s)':>10} {'요청당(ms)':>11}")
+    for label, run, target in (('매번 새로 생성', fresh, registry), ('풀에서 대여', pooled, pool)):
+        start = time.perf_counter()
+        for i in range(args.count):
+            run(target, args.platform, ie_key, f"/tmp/{i}.%(ext)s")
+        elapsed = time.perf_counter() - start
+        print(f"{label:<16} {elapsed:>10.3f} {elapsed / args.count * 1000:>11.3f}")
+    print(f"풀 통계: {pool.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+벤치마크용 로컬 HTTP 서버
+메모리의 바이트를 Range 요청을 지원하며 내보냅니다. CDN의 연결당 속도 제한과
+응답 도중 연결이 끊기는 상황을 흉내 낼 수 있습니다.
+"""
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_RANGE_RE = re.compile(r'bytes=(\d+)-(\d*)')
+
+
+class RangeServer:
+    """payload를 /video.mp4 로 제공합니다.
+
+    rate: 연결당 초당 바이트 (None이면 제한 없음)
+    fail_every: n번째 요청마다 응답 절반쯤에서 연결을 끊음 (0이면 끊지 않음)
+    ranges: False면 Range를 무시하고 항상 전체를 200으로 응답
+    """
+
+    def __init__(self, payload, rate=None, fail_every=0, ranges=True, etag='"bench"'):
+        self.payload = payload
+        self.rate = rate
+        self.fail_every = fail_every
+        self.ranges = ranges
+        self.etag = etag
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/video.mp4"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # keep-alive 연결에서 헤더와 본문을 따로 쓸 때 지연 방지
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (ConnectionResetError, BrokenPipeError):
+                    # 클라이언트가 먼저 끊은 경우 (조기 종료, 이어받기 테스트)
+                    pass
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def _respond(self, send_body):
+                with server._lock:
+                    server.requests += 1
+                    fail = server.fail_every and server.requests % server.fail_every == 0
+                total = len(server.payload)
+                start, end = 0, total - 1
+                match = _RANGE_RE.fullmatch(self.headers.get('Range', '')) if server.ranges else None
+                if match:
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)) if match.group(2) else total - 1, total - 1)
+                    if start >= total:
+                        self.send_response(416)
+                        self.send_header('Content-Range', f'bytes */{total}')
+                        self.send_header('Content-Length', '0')
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {start}-{end}/{total}')
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'video/mp4')
+                self.send_header('Content-Length', str(end - start + 1))
+                self.send_header('ETag', server.etag)
+                if server.ranges:
+                    self.send_header('Accept-Ranges', 'bytes')
+                self.end_headers()
+                if send_body:
+                    self._send(start, end, fail)
+
+            def _send(self, start, end, fail):
+                cut = start + (end - start + 1) // 2 if fail else None
+                block = 64 * 1024
+                began = time.monotonic()
+                sent = 0
+                pos = start
+                while pos <= end:
+                    stop = min(pos + block, end + 1)
+                    if cut is not None and stop > cut:
+                        self.wfile.write(server.payload[pos:cut])
+                        with server._lock:
+                            server.failures += 1
+                        self.close_connection = True
+                        return
+                    self.wfile.write(server.payload[pos:stop])
+                    sent += stop - pos
+                    pos = stop
+                    if server.rate:
+                        ahead = sent / server.rate - (time.monotonic() - began)
+                        if ahead > 0:
+                            time.sleep(ahead)
+
+        return Handler
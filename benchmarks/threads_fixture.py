@@ -0,0 +1,110 @@
+"""
+벤치마크용 Threads 페이지 생성기
+실제 Threads 게시물 HTML처럼 스크립트 태그 안에 이스케이프된 JSON(이미지 후보, 프로필 사진,
+링크 등)이 수백 KB 들어 있고, 영상 URL은 그 사이 어딘가에 한 번 나오는 페이지를 만듭니다.
+make_state는 같은 게시물들로 __APOLLO_STATE__ 형태의 상태 JSON을 만듭니다.
+저장해 둔 실제 페이지/상태 JSON이 있으면 각 벤치마크에 파일 경로로 넘겨 대신 쓸 수 있습니다.
+"""
+
+import json
+import random
+import string
+
+
+def _token(rng, length, alphabet=string.ascii_letters + string.digits):
+    return ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def _cdn(rng, ext):
+    return (f"https://scontent-icn2-1.cdninstagram.com/v/t51.2885-15/{_token(rng, 24)}_n.{ext}"
+            f"?stp=dst-jpg_e35&efg={_token(rng, 40)}&_nc_ht=scontent-icn2-1.cdninstagram.com"
+            f"&oh=00_{_token(rng, 30)}&oe={_token(rng, 8, '0123456789ABCDEF')}")
+
+
+def _post(rng, index):
+    return {
+        'pk': str(rng.randint(10 ** 18, 10 ** 19)),
+        'code': _token(rng, 11),
+        'caption': {'text': ' '.join(_token(rng, rng.randint(2, 9), string.ascii_lowercase) for _ in range(30))},
+        'user': {
+            'username': _token(rng, 10, string.ascii_lowercase),
+            'profile_pic_url': _cdn(rng, 'jpg'),
+            'is_verified': rng.random() < 0.1,
+        },
+        'image_versions2': {'candidates': [
+            {'width': w, 'height': w, 'url': _cdn(rng, 'jpg')} for w in (1080, 750, 640, 480, 320, 240, 150)
+        ]},
+        'text_post_app_info': {'link_preview_attachment': {'url': f"https://example.com/{_token(rng, 16)}"}},
+        'like_count': rng.randint(0, 100000),
+        'taken_at': 1700000000 + index,
+    }
+
+
+def video_url(rng):
+    return (f"https://scontent-icn2-1.cdninstagram.com/o1/v/t16/f2/m86/{_token(rng, 40)}.mp4"
+            f"?efg={_token(rng, 60)}&_nc_ht=scontent-icn2-1.cdninstagram.com&oh=00_{_token(rng, 30)}")
+
+
+def make_page(seed=0, size_kb=400, video_at=0.8):
+    """(html, 영상 URL)을 반환합니다. video_at은 영상이 나오는 위치(페이지 비율)입니다."""
+    rng = random.Random(seed)
+    url = video_url(rng)
+    scripts = []
+    total = 0
+    target = size_kb * 1024
+    index = 0
+    placed = False
+    while total < target:
+        post = _post(rng, index)
+        if not placed and total >= target * video_at:
+            post['video_versions'] = [
+                {'type': 101, 'width': 720, 'height': 1280, 'url': url},
+                {'type': 102, 'width': 480, 'height': 854, 'url': url.replace('.mp4', '_480.mp4')},
+                {'type': 103, 'width': 360, 'height': 640, 'url': url.replace('.mp4', '_360.mp4')},
+            ]
+            placed = True
+        # 실제 페이지처럼 / 를 \/ 로 이스케이프한 JSON
+        body = json.dumps({'require': [['ScheduledServerJS', 'handle', None, [{'__bbox': {'result': {'data': post}}}]]]},
+                          separators=(',', ':')).replace('/', '\\/')
+        script = f'<script type="application/json" data-content-len="{len(body)}" data-sjs>{body}</script>\n'
+        scripts.append(script)
+        total += len(script)
+        index += 1
+    head = ('<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>Threads</title>'
+            '<link rel="stylesheet" href="https://static.cdninstagram.com/rsrc.php/v3/app.css"></head><body>\n')
+    return head + ''.join(scripts) + '</body></html>\n', url
+
+
+def make_state(seed=0, posts=2000, video_at=0.8, depth=0):
+    """(__APOLLO_STATE__ 형태의 dict, 가장 높은 해상도의 영상 URL)을 반환합니다.
+
+    정규화된 캐시처럼 게시물마다 'Post:<pk>' 항목이 있고, video_at 위치의 게시물에만
+    해상도가 다른 video_versions가 들어 있습니다. depth를 주면 그 깊이만큼 감싼 구조로 만듭니다.
+    """
+    rng = random.Random(seed)
+    url = video_url(rng)
+    state = {'ROOT_QUERY': {'__typename': 'Query', 'feed': []}}
+    for index in range(posts):
+        post = _post(rng, index)
+        post['__typename'] = 'Post'
+        if index == int(posts * video_at):
+            # 낮은 해상도가 먼저 나오도록 섞어 둔다
+            post['video_versions'] = [
+                {'type': 103, 'width': 360, 'height': 640, 'url': url.replace('.mp4', '_360.mp4')},
+                {'type': 101, 'width': 720, 'height': 1280, 'url': url},
+                {'type': 102, 'width': 480, 'height': 854, 'url': url.replace('.mp4', '_480.mp4')},
+            ]
+        state[f"Post:{post['pk']}"] = post
+        state['ROOT_QUERY']['feed'].append({'__ref': f"Post:{post['pk']}"})
+    for _ in range(depth):
+        state = {'data': {'node': state}}
+    return state, url
+
+
+def load_pages(paths):
+    """저장해 둔 HTML 파일들을 읽습니다."""
+    pages = []
+    for path in paths:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append((path, f.read()))
+    return pages
@@ -0,0 +1,157 @@
+"""
+완성 파일 저장소
+(플랫폼, 영상 ID, 포맷) 키마다 디스크에 파일 하나만 두고, 같은 영상 요청은 다운로드 없이 기존 파일을 돌려줍니다.
+인덱스는 JSON 파일로 저장되어 재시작 후에도 유지됩니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = '.content_index.json'
+
+
+def make_key(platform, video_id, format_selector):
+    """저장소 키(16진수 해시)를 만듭니다."""
+    raw = '\0'.join([platform or '', video_id or '', format_selector or ''])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ContentStore:
+    """콘텐츠 주소 기반 파일 저장소입니다.
+
+    refcount는 현재 파일을 쓰고 있는 요청(전송 중인 응답 등) 수이며 메모리에만 유지합니다.
+    """
+
+    def __init__(self, folder, index_filename=INDEX_FILENAME):
+        self.folder = folder
+        self.index_path = os.path.join(folder, index_filename)
+        self._entries = {}
+        self._by_filename = {}
+        self._refs = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def lookup(self, key):
+        """키에 해당하는 파일 이름을 반환합니다. 없거나 파일이 사라졌으면 None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if not os.path.exists(os.path.join(self.folder, entry['filename'])):
+                self._drop(key)
+                self._save()
+                self.misses += 1
+                return None
+            entry['last_access'] = time.time()
+            entry['hits'] += 1
+            self.hits += 1
+            return entry['filename']
+
+    def put(self, key, path, platform=None, video_id=None, format_selector=None):
+        """다운로드된 파일을 키 이름으로 옮기고 저장소에 등록합니다. 최종 파일 이름을 반환합니다."""
+        ext = os.path.splitext(path)[1] or '.mp4'
+        filename = f"{key[:32]}{ext}"
+        dest = os.path.join(self.folder, filename)
+        if os.path.abspath(path) != os.path.abspath(dest):
+            os.replace(path, dest)
+        now = time.time()
+        with self._lock:
+            old = self._entries.get(key)
+            if old and old['filename'] != filename:
+                self._by_filename.pop(old['filename'], None)
+            self._entries[key] = {
+                'filename': filename,
+                'platform': platform,
+                'video_id': video_id,
+                'format': format_selector,
+                'size': os.path.getsize(dest),
+                'created_at': now,
+                'last_access': now,
+                'hits': 0,
+            }
+            self._by_filename[filename] = key
+            self._save()
+        logger.info(f"저장소 등록: {filename} ({platform} {video_id})")
+        return filename
+
+    def remove(self, filename):
+        """파일 이름에 해당하는 항목을 인덱스에서 제거합니다. 파일 삭제는 호출자가 합니다."""
+        with self._lock:
+            key = self._by_filename.get(filename)
+            if key is None:
+                return False
+            self._drop(key)
+            self._save()
+            return True
+
+    def acquire(self, filename):
+        with self._lock:
+            self._refs[filename] = self._refs.get(filename, 0) + 1
+
+    def release(self, filename):
+        with self._lock:
+            count = self._refs.get(filename, 0) - 1
+            if count > 0:
+                self._refs[filename] = count
+            else:
+                self._refs.pop(filename, None)
+
+    def refcount(self, filename):
+        with self._lock:
+            return self._refs.get(filename, 0)
+
+    def entry_for(self, filename):
+        """파일 이름에 해당하는 항목의 복사본을 반환합니다."""
+        with self._lock:
+            key = self._by_filename.get(filename)
+            if key is None:
+                return None
+            entry = dict(self._entries[key])
+            entry['key'] = key
+            return entry
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': sum(entry['size'] for entry in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'in_use': len(self._refs),
+            }
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._by_filename.pop(entry['filename'], None)
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"저장소 인덱스를 읽을 수 없습니다: {str(e)}")
+            return
+        for key, entry in entries.items():
+            if os.path.exists(os.path.join(self.folder, entry['filename'])):
+                self._entries[key] = entry
+                self._by_filename[entry['filename']] = key
+        logger.info(f"저장소 인덱스 로드: {len(self._entries)}개 항목")
+
+    def _save(self):
+        # lock을 잡은 상태에서 호출. 임시 파일에 쓴 뒤 교체해 중간에 깨지지 않게 한다.
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.index_path)
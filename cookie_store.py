@@ -0,0 +1,109 @@
+"""
+공유 쿠키 저장소
+Netscape 형식 쿠키 파일(브라우저 확장 등으로 내보낸 cookies.txt)을 프로세스당 한 번 읽어 두고,
+파일이 바뀌면 (수정 시각 기준) 다시 읽습니다.
+요청마다 브라우저 쿠키 DB를 복호화하던 cookiesfrombrowser를 대신하며, 서버(헤드리스)에서도 동작합니다.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from yt_dlp.cookies import YoutubeDLCookieJar, extract_cookies_from_browser
+
+logger = logging.getLogger(__name__)
+
+
+class CookieStore:
+    """읽기 전용 쿠키 목록을 보관하고 YoutubeDL의 쿠키 저장소에 채워 넣습니다.
+
+    path가 없으면 browser(예: 'chrome')에서 시작 시 한 번만 읽습니다. 둘 다 없으면 빈 저장소입니다.
+    """
+
+    def __init__(self, path=None, browser=None, check_interval=30):
+        self.path = path
+        self.browser = browser
+        self.check_interval = check_interval
+        self.version = 0
+        self.loaded_at = None
+        self.reload_errors = 0
+        self._cookies = ()
+        self._mtime = None
+        self._last_check = 0
+        self._lock = threading.Lock()
+        if path:
+            self.reload()
+        elif browser:
+            self._load_browser()
+
+    def apply(self, jar, version=None):
+        """jar의 쿠키를 저장소 내용으로 바꾸고 적용한 버전을 반환합니다.
+
+        version이 현재 버전과 같으면 아무것도 하지 않으므로 매 작업마다 호출해도 비용이 없습니다.
+        """
+        self._maybe_reload()
+        with self._lock:
+            current, cookies = self.version, self._cookies
+        if version == current:
+            return current
+        jar.clear()
+        for cookie in cookies:
+            jar.set_cookie(cookie)
+        return current
+
+    def reload(self):
+        """쿠키 파일을 다시 읽습니다. 실패하면 이전 쿠키를 유지하고 False를 반환합니다."""
+        try:
+            mtime = os.path.getmtime(self.path)
+            jar = YoutubeDLCookieJar(self.path)
+            jar.load()
+        except Exception as e:
+            self.reload_errors += 1
+            logger.error(f"쿠키 파일을 읽지 못했습니다: {str(e)}")
+            return False
+        self._swap(tuple(jar), mtime)
+        logger.info(f"쿠키 {len(self._cookies)}개 로드: {self.path}")
+        return True
+
+    def stats(self):
+        return {
+            'source': self.path or self.browser,
+            'cookies': len(self._cookies),
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'reload_errors': self.reload_errors,
+        }
+
+    def _load_browser(self):
+        try:
+            jar = extract_cookies_from_browser(self.browser)
+        except Exception as e:
+            self.reload_errors += 1
+            logger.error(f"브라우저 쿠키를 읽지 못했습니다: {str(e)}")
+            return
+        self._swap(tuple(jar), None)
+        logger.info(f"쿠키 {len(self._cookies)}개 로드: {self.browser}")
+
+    def _swap(self, cookies, mtime):
+        with self._lock:
+            self._cookies = cookies
+            self._mtime = mtime
+            self.version += 1
+            self.loaded_at = time.time()
+
+    def _maybe_reload(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            # 실패해도 같은 파일을 매번 다시 읽지 않도록 먼저 기록
+            self._mtime = mtime
+            self.reload()
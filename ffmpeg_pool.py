@@ -0,0 +1,85 @@
+"""
+ffmpeg 작업 풀
+코어 수에 맞춘 고정 개수의 워커에서 후처리를 실행해 동시 변환이 CPU를 과점하지 않게 합니다.
+우선순위가 낮은 값(짧은 영상, remux)부터 처리합니다.
+"""
+
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+def default_sizing(cores=None):
+    """(워커 수, 작업당 ffmpeg 스레드 수)를 코어 수에 맞춰 정합니다."""
+    cores = cores or os.cpu_count() or 1
+    threads_per_job = 2 if cores >= 4 else 1
+    return max(1, cores // threads_per_job), threads_per_job
+
+
+class FFmpegPool:
+    """fn(threads)를 우선순위 큐에서 꺼내 고정된 워커로 실행합니다."""
+
+    def __init__(self, workers=None, threads_per_job=None):
+        default_workers, default_threads = default_sizing()
+        self.workers = workers or default_workers
+        self.threads_per_job = threads_per_job or default_threads
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f'ffmpeg-{i}', daemon=True).start()
+        logger.info(f"ffmpeg 풀: 워커 {self.workers}개, 작업당 스레드 {self.threads_per_job}개")
+
+    def submit(self, fn, priority=0):
+        """작업을 큐에 넣고 Future를 반환합니다. fn은 ffmpeg 스레드 수를 인자로 받습니다."""
+        future = Future()
+        self._queue.put((priority, next(self._seq), time.perf_counter(), fn, future))
+        return future
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'threads_per_job': self.threads_per_job,
+                'queued': self._queue.qsize(),
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'wait_seconds': self.wait_seconds,
+                'run_seconds': self.run_seconds,
+            }
+
+    def _worker(self):
+        while True:
+            priority, _, enqueued_at, fn, future = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            started_at = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait_seconds += started_at - enqueued_at
+            try:
+                result = fn(self.threads_per_job)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                future.set_exception(e)
+            else:
+                with self._lock:
+                    self.completed += 1
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.run_seconds += time.perf_counter() - started_at
@@ -0,0 +1,125 @@
+"""
+DASH/HLS 조각 다운로드 예산
+작업마다 concurrent_fragment_downloads개 스레드로 조각을 동시에 받되,
+모든 작업이 함께 쓰는 전역 동시 조각 수(예산)를 넘지 않게 합니다.
+큰 영상 하나가 연결을 독차지해 다른 작업이 멈추는 일을 막습니다.
+"""
+
+import collections
+import threading
+import time
+from contextlib import contextmanager
+
+from yt_dlp.downloader.dash import DashSegmentsFD
+from yt_dlp.downloader.hls import HlsFD
+
+# 전역 처리량을 계산하는 구간 (초)
+THROUGHPUT_WINDOW = 10
+
+
+class FragmentBudget:
+    """전역 조각 동시 실행 수를 limit개로 제한하고 작업별/전체 처리량을 집계합니다."""
+
+    def __init__(self, limit=16):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._recent = collections.deque()  # (완료 시각, 바이트)
+        self._jobs = {}  # job_id -> {'fragments', 'bytes', 'started_at'}
+        self.active = 0
+        self.peak_active = 0
+        self.waiting = 0
+        self.wait_seconds = 0.0
+        self.fragments = 0
+        self.bytes = 0
+
+    @contextmanager
+    def slot(self, job_id=None):
+        """조각 하나를 받는 동안 예산 한 칸을 차지합니다. record(바이트 수)로 결과를 기록합니다."""
+        started = time.monotonic()
+        with self._lock:
+            self.waiting += 1
+        self._semaphore.acquire()
+        with self._lock:
+            self.waiting -= 1
+            self.wait_seconds += time.monotonic() - started
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+
+        def record(nbytes):
+            now = time.monotonic()
+            with self._lock:
+                self.fragments += 1
+                self.bytes += nbytes
+                self._recent.append((now, nbytes))
+                if job_id is not None:
+                    job = self._jobs.setdefault(job_id, {'fragments': 0, 'bytes': 0, 'started_at': now})
+                    job['fragments'] += 1
+                    job['bytes'] += nbytes
+
+        try:
+            yield record
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._semaphore.release()
+
+    def end_job(self, job_id):
+        """끝난 작업의 집계를 지웁니다."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0][0] > THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            recent_bytes = sum(nbytes for _, nbytes in self._recent)
+            jobs = {
+                job_id: {
+                    'fragments': job['fragments'],
+                    'bytes': job['bytes'],
+                    'bytes_per_sec': job['bytes'] / max(now - job['started_at'], 1e-3),
+                }
+                for job_id, job in self._jobs.items()
+            }
+            return {
+                'limit': self.limit,
+                'active': self.active,
+                'peak_active': self.peak_active,
+                'waiting': self.waiting,
+                'wait_seconds': self.wait_seconds,
+                'fragments': self.fragments,
+                'bytes': self.bytes,
+                'bytes_per_sec': recent_bytes / THROUGHPUT_WINDOW,
+                'jobs': jobs,
+            }
+
+
+class BudgetedFragmentMixin:
+    """조각마다 ydl.fragment_budget의 한 칸을 받아 다운로드합니다. 예산이 없으면 그대로 받습니다."""
+
+    def _download_fragment(self, ctx, frag_url, info_dict, headers=None, request_data=None):
+        budget = getattr(self.ydl, 'fragment_budget', None)
+        if budget is None:
+            return super()._download_fragment(ctx, frag_url, info_dict, headers, request_data)
+        with budget.slot(getattr(self.ydl, 'job_id', None)) as record:
+            ok = super()._download_fragment(ctx, frag_url, info_dict, headers, request_data)
+            if ok:
+                record(self.filesize_or_none(ctx['fragment_filename_sanitized']) or 0)
+        return ok
+
+
+class BudgetedHlsFD(BudgetedFragmentMixin, HlsFD):
+    pass
+
+
+class BudgetedDashSegmentsFD(BudgetedFragmentMixin, DashSegmentsFD):
+    pass
+
+
+# yt-dlp 기본 조각 다운로더 -> 예산을 쓰는 다운로더
+BUDGETED_DOWNLOADERS = {
+    HlsFD: BudgetedHlsFD,
+    DashSegmentsFD: BudgetedDashSegmentsFD,
+}
@@ -0,0 +1,151 @@
+"""
+공유 HTTP 세션
+Threads/Instagram 스크래퍼가 요청마다 새 TCP+TLS 연결을 맺지 않도록 프로세스 전체가
+하나의 requests.Session을 함께 씁니다.
+
+- 호스트별 연결 풀 + keep-alive (같은 호스트로 가는 요청은 열린 연결을 재사용)
+- 연결 실패/429/5xx 응답은 지수 백오프로 재시도 (GET/HEAD만)
+- DNS 조회 결과를 TTL 동안 캐시 (새 연결을 맺을 때도 조회를 반복하지 않음)
+
+requests.Session의 연결 풀(urllib3)과 쿠키 저장소는 스레드 간에 공유해도 안전합니다.
+"""
+
+import logging
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# DNS 조회 결과를 재사용하는 시간 (초)
+DNS_TTL = 300
+
+# 호스트당 유지하는 연결 수
+POOL_MAXSIZE = 16
+
+
+class DnsCache:
+    """(호스트, 포트) -> IP 주소를 TTL 동안 보관합니다."""
+
+    def __init__(self, ttl=DNS_TTL):
+        self.ttl = ttl
+        self._entries = {}  # (host, port) -> (만료 시각, 주소)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host, port):
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # 조회는 락 밖에서 (느린 DNS가 다른 호스트 요청을 막지 않도록)
+        address = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0][4][0]
+        with self._lock:
+            self._entries[key] = (now + self.ttl, address)
+        return address
+
+    def invalidate(self, host, port):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+dns_cache = DnsCache()
+
+
+class _CachedDnsMixin:
+    """새 연결을 맺을 때만 캐시된 IP로 접속합니다. TLS SNI와 인증서 검증은 원래 호스트 이름으로 합니다."""
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            address = dns_cache.resolve(host, self.port)
+        except OSError:
+            # 조회 실패는 urllib3가 원래 방식대로 처리하게 둔다
+            return super()._new_conn()
+        self._dns_host = address
+        try:
+            return super()._new_conn()
+        except Exception:
+            # 주소가 바뀌었을 수 있으므로 다음 연결은 다시 조회
+            dns_cache.invalidate(host, self.port)
+            raise
+        finally:
+            self._dns_host = host
+
+
+class CachedDnsHTTPConnection(_CachedDnsMixin, HTTPConnection):
+    pass
+
+
+class CachedDnsHTTPSConnection(_CachedDnsMixin, HTTPSConnection):
+    pass
+
+
+class CachedDnsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = CachedDnsHTTPConnection
+
+
+class CachedDnsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = CachedDnsHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """DNS 캐시를 쓰는 연결 풀 어댑터."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CachedDnsHTTPConnectionPool,
+            'https': CachedDnsHTTPSConnectionPool,
+        }
+
+
+def make_session(pool_maxsize=POOL_MAXSIZE, retries=3, backoff_factor=0.5):
+    """keep-alive 연결 풀, 재시도, DNS 캐시를 갖춘 Session을 만듭니다."""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        # 마지막 응답은 그대로 돌려주어 호출하는 쪽이 status_code/raise_for_status로 판단
+        raise_on_status=False,
+    )
+    adapter = PooledAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """프로세스 전체가 함께 쓰는 Session을 반환합니다 (처음 호출할 때 만듦)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+                logger.info("공유 HTTP 세션 생성")
+    return _session
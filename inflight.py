@@ -0,0 +1,124 @@
+"""
+진행 중인 다운로드 등록부
+같은 영상에 대한 동시 요청은 먼저 온 요청(leader)의 결과를 기다리고 직접 다운로드하지 않습니다.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class InflightTimeoutError(Exception):
+    """leader가 제한 시간 안에 끝나지 않았을 때 follower에게 전달됩니다."""
+
+
+class Flight:
+    """진행 중인 다운로드 하나입니다. 결과나 오류는 한 번만 정해집니다."""
+
+    def __init__(self, key):
+        self.key = key
+        self.started_at = time.time()
+        self.followers = 0
+        self.result = None
+        self.error = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def done(self):
+        return self._event.is_set()
+
+    def add_done_callback(self, fn):
+        """완료 시 fn(flight)를 호출합니다. 이미 끝났으면 바로 호출합니다."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def wait(self, timeout=None):
+        """결과를 기다려 반환합니다. leader가 실패했으면 그 오류를 발생시킵니다."""
+        if not self._event.wait(timeout):
+            raise InflightTimeoutError("동일한 영상의 다운로드를 기다리다 시간이 초과되었습니다.")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _set(self, result=None, error=None):
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.result = result
+            self.error = error
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                logger.error(f"완료 콜백 실패: {str(e)}")
+        return True
+
+
+class InflightRegistry:
+    """영상 키별 진행 중인 다운로드를 관리합니다."""
+
+    def __init__(self, timeout=900):
+        self.timeout = timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def join(self, key):
+        """(flight, leader 여부)를 반환합니다. leader는 끝나면 finish()를 호출해야 합니다."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.coalesced += 1
+                return flight, False
+            flight = Flight(key)
+            self._flights[key] = flight
+            self.leaders += 1
+        if self.timeout:
+            flight._timer = threading.Timer(self.timeout, self._expire, args=(flight,))
+            flight._timer.daemon = True
+            flight._timer.start()
+        return flight, True
+
+    def finish(self, flight, result=None, error=None):
+        """leader의 결과를 기록하고 기다리던 follower들에게 전달합니다."""
+        self._release(flight)
+        if flight._timer is not None:
+            flight._timer.cancel()
+        if flight._set(result, error) and flight.followers:
+            logger.info(f"동일 영상 요청 {flight.followers}건에 결과 전달: {flight.key}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'inflight': len(self._flights),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+                'timeouts': self.timeouts,
+            }
+
+    def _release(self, flight):
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def _expire(self, flight):
+        # 멈춘 leader 때문에 follower가 무한히 기다리지 않도록 실패 처리.
+        # 등록부에서도 빼서 다음 요청은 새로 다운로드를 시작한다.
+        self._release(flight)
+        if flight._set(error=InflightTimeoutError("동일한 영상의 다운로드를 기다리다 시간이 초과되었습니다.")):
+            with self._lock:
+                self.timeouts += 1
+            logger.warning(f"진행 중인 다운로드 시간 초과: {flight.key}")
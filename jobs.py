@@ -0,0 +1,174 @@
+"""
+다운로드 작업 큐
+HTTP 요청 스레드와 분리된 고정 크기 워커 풀에서 다운로드를 실행합니다.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# 작업 상태
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_PROCESSING = 'processing'  # 다운로드는 끝나고 후처리 대기/진행 중
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+class QueueFullError(Exception):
+    """대기 중인 작업이 너무 많아 새 작업을 받을 수 없을 때 발생합니다."""
+
+
+class Job:
+    """다운로드 작업 하나의 상태를 담습니다."""
+
+    def __init__(self, url, platform, key=None, flight=None):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.platform = platform
+        self.key = key  # (플랫폼, 영상 ID) - 캐시/중복 제거용
+        self.flight = flight  # 이 작업이 leader인 진행 중 다운로드 (inflight.Flight)
+        self.status = JOB_QUEUED
+        self.filename = None
+        self.error = None
+        self.postprocess = None  # 후처리 경로와 소요 시간
+        self.progressive = None  # 다운로드 중 스트리밍 (progressive.ProgressiveFile)
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    def to_dict(self):
+        """JSON 응답용 딕셔너리를 반환합니다."""
+        return {
+            'id': self.id,
+            'url': self.url,
+            'platform': self.platform,
+            'status': self.status,
+            'filename': self.filename,
+            'error': self.error,
+            'postprocess': self.postprocess,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """작업을 등록하고 워커 풀에서 runner(job)를 실행합니다.
+
+    runner는 완성된 파일의 이름(DOWNLOAD_FOLDER 기준)을 반환하고, 실패하면 예외를 발생시킵니다.
+    후처리를 다른 풀에 넘길 때는 파일 이름으로 끝나는 Future를 반환하면 워커를 바로 놓아줍니다.
+    """
+
+    def __init__(self, runner, max_workers=2, max_pending=50, retention=3600):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self._jobs = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='download')
+
+    def submit(self, url, platform, key=None, flight=None):
+        """새 작업을 큐에 넣고 Job을 즉시 반환합니다."""
+        job = Job(url, platform, key, flight)
+        with self._lock:
+            self._prune()
+            if self._pending >= self.max_pending:
+                raise QueueFullError("대기 중인 다운로드가 너무 많습니다. 잠시 후 다시 시도해주세요.")
+            self._pending += 1
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job)
+        logger.info(f"작업 등록: {job.id} ({platform}) {url}")
+        return job
+
+    def add_finished(self, url, platform, filename, key=None):
+        """이미 결과가 있는 요청을 완료된 작업으로 등록합니다."""
+        job = self.add_waiting(url, platform, key)
+        self.resolve(job, filename=filename)
+        return job
+
+    def add_waiting(self, url, platform, key=None):
+        """워커를 쓰지 않고 다른 곳의 결과를 기다리는 작업을 등록합니다. resolve()로 끝냅니다."""
+        job = Job(url, platform, key)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def resolve(self, job, filename=None, error=None):
+        """add_waiting()으로 등록한 작업을 완료 또는 실패 처리합니다."""
+        if job.started_at is None:
+            job.started_at = job.created_at
+        job.finished_at = time.time()
+        if error is not None:
+            job.error = str(error)
+            job.status = JOB_FAILED
+        else:
+            job.filename = filename
+            job.status = JOB_DONE
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                'workers': self.max_workers,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'jobs': counts,
+            }
+
+    def _run(self, job):
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        try:
+            result = self.runner(job)
+        except Exception as e:
+            self._finish(job, error=e)
+            return
+        if isinstance(result, Future):
+            job.status = JOB_PROCESSING
+            result.add_done_callback(lambda future: self._finish_future(job, future))
+        else:
+            self._finish(job, filename=result)
+
+    def _finish_future(self, job, future):
+        error = future.exception()
+        if error is not None:
+            self._finish(job, error=error)
+        else:
+            self._finish(job, filename=future.result())
+
+    def _finish(self, job, filename=None, error=None):
+        self.resolve(job, filename=filename, error=error)
+        if error is not None:
+            logger.error(f"작업 실패: {job.id} - {str(error)}")
+        else:
+            logger.info(f"작업 완료: {job.id} -> {job.filename}")
+        with self._lock:
+            self._pending -= 1
+
+    def _prune(self):
+        # 오래된 완료 작업 정리 (lock을 잡은 상태에서 호출)
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
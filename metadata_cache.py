@@ -0,0 +1,167 @@
+"""
+extract_info 결과 캐시
+영상 ID 기준으로 추출 결과를 메모리에 보관해 같은 영상의 반복 요청이 추출기를 다시 돌리지 않게 합니다.
+"""
+
+import copy
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import yt_dlp
+
+import platforms
+
+logger = logging.getLogger(__name__)
+
+# 플랫폼별 기본 TTL (초). 서명된 미디어 URL의 만료 시각이 더 이르면 그쪽을 따른다.
+PLATFORM_TTLS = {
+    'YouTube': 4 * 3600,
+    'TikTok': 10 * 60,
+    'Instagram': 30 * 60,
+    'Reddit': 60 * 60,
+    'Twitter/X': 30 * 60,
+    'Threads': 15 * 60,
+}
+DEFAULT_TTL = 10 * 60
+
+# 만료 직전의 URL로 다운로드를 시작하지 않도록 두는 여유 시간 (초)
+EXPIRY_MARGIN = 120
+
+# 서명 URL 만료 시각: YouTube expire, TikTok x-expires, CloudFront Expires (유닉스 시간)
+_EXPIRE_RE = re.compile(r'[?&/](?:expire|x-expires|Expires)[=/](\d{9,11})')
+# Instagram/Facebook CDN oe (16진수 유닉스 시간)
+_OE_RE = re.compile(r'[?&]oe=([0-9A-Fa-f]{8})')
+
+
+def video_key(url):
+    """URL에서 (플랫폼, 영상 ID) 키를 네트워크 없이 구합니다. 알 수 없으면 None.
+
+    지원 플랫폼은 platforms의 정규화 키를, 그 외 사이트는 yt-dlp 추출기의 (추출기, 영상 ID)를 씁니다.
+    """
+    key = platforms.video_key(url)
+    if key:
+        return key
+    for ie in yt_dlp.extractor.gen_extractor_classes():
+        if ie.ie_key() == 'Generic' or not ie.suitable(url):
+            continue
+        video_id = ie.get_temp_id(url)
+        if video_id:
+            return ie.ie_key(), video_id
+        return None
+    return None
+
+
+def warm_up_extractors():
+    """yt-dlp 추출기를 불러오고 URL 정규식을 미리 컴파일합니다.
+
+    지원 플랫폼이 아닌 URL의 video_key는 모든 추출기의 suitable()을 검사하는데, 첫 호출은
+    추출기 로드와 정규식 컴파일로 수백 ms가 걸립니다 (이후에는 수 ms).
+    """
+    started = time.monotonic()
+    video_key('https://extractor-warm-up.invalid/')
+    logger.info(f"yt-dlp 추출기 준비 완료: {time.monotonic() - started:.2f}초")
+
+
+def start_warm_up():
+    """warm_up_extractors를 백그라운드 스레드에서 실행해 첫 요청이 그 비용을 내지 않게 합니다."""
+    thread = threading.Thread(target=warm_up_extractors, name='extractor-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def url_expiry(url):
+    """서명된 미디어 URL의 만료 시각(유닉스 시간)을 반환합니다. 없으면 None."""
+    if not url:
+        return None
+    match = _EXPIRE_RE.search(url)
+    if match:
+        return int(match.group(1))
+    match = _OE_RE.search(url)
+    if match:
+        return int(match.group(1), 16)
+    return None
+
+
+def info_expiry(info):
+    """선택된 포맷 URL 중 가장 이른 만료 시각을 반환합니다."""
+    formats = info.get('requested_formats') or [info]
+    expiries = [url_expiry(f.get('url')) for f in formats]
+    expiries = [e for e in expiries if e]
+    return min(expiries) if expiries else None
+
+
+class MetadataCache:
+    """TTL과 LRU 크기 제한이 있는 스레드 안전한 info dict 캐시입니다."""
+
+    def __init__(self, max_entries=512, ttls=None, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = dict(PLATFORM_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """캐시된 info dict의 복사본을 반환합니다. 없거나 만료되었으면 None."""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, info = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(info)
+
+    def put(self, key, info, platform):
+        """info dict를 저장합니다. 만료 시각은 플랫폼 TTL과 서명 URL 만료 중 이른 쪽입니다."""
+        if key is None or not info:
+            return
+        now = time.time()
+        expires_at = now + self.ttls.get(platform, self.default_ttl)
+        signed_expiry = info_expiry(info)
+        if signed_expiry:
+            expires_at = min(expires_at, signed_expiry - EXPIRY_MARGIN)
+        if expires_at <= now:
+            return
+        try:
+            info = copy.deepcopy(info)
+        except Exception as e:
+            logger.debug(f"info dict 복사 실패, 캐시하지 않음: {str(e)}")
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, info)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
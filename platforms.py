@@ -0,0 +1,158 @@
+"""
+플랫폼 라우터
+URL의 호스트 이름을 접미사 색인에서 찾고, 그 플랫폼의 컴파일된 경로 패턴만 검사해
+플랫폼, 정규화된 URL, 영상 ID를 한 번에 구합니다.
+색인과 패턴은 import 시 한 번만 만들어집니다.
+한 요청 안에서도 detect_platform, video_key 등이 같은 URL을 여러 번 조회하므로 결과를 캐시합니다.
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+Route = namedtuple('Route', 'platform icon color canonical_url video_id')
+
+UNKNOWN = ('Unknown', 'fas fa-video', '#666666')
+
+# 플랫폼 이름, 아이콘, 색상, 호스트(접미사), (경로 패턴, 정규화 URL 템플릿) 목록.
+# 패턴은 '경로?쿼리' 문자열의 시작에 맞춰 검사하며 'id' 그룹이 영상 ID입니다.
+# 템플릿이 None이면 원래 URL을 그대로 씁니다 (단축 링크 등 리다이렉트가 필요한 경우).
+PLATFORMS = [
+    ('YouTube', 'fab fa-youtube', '#FF0000',
+     ('youtube.com', 'youtube-nocookie.com'),
+     [
+         (r'/watch/?\?(?:[^#]*&)?v=(?P<id>[\w-]{11})', 'https://www.youtube.com/watch?v={id}'),
+         (r'/(?:shorts|embed|live|v|e)/(?P<id>[\w-]{11})', 'https://www.youtube.com/watch?v={id}'),
+     ]),
+    ('YouTube', 'fab fa-youtube', '#FF0000',
+     ('youtu.be',),
+     [
+         (r'/(?P<id>[\w-]{11})', 'https://www.youtube.com/watch?v={id}'),
+     ]),
+    ('TikTok', 'fab fa-tiktok', '#000000',
+     ('tiktok.com',),
+     [
+         (r'/@(?P<user>[\w.-]+)/video/(?P<id>\d+)', 'https://www.tiktok.com/@{user}/video/{id}'),
+         (r'/(?:v|embed(?:/v2)?)/(?P<id>\d+)', 'https://www.tiktok.com/@/video/{id}'),
+     ]),
+    ('Instagram', 'fab fa-instagram', '#E4405F',
+     ('instagram.com', 'instagr.am'),
+     [
+         (r'/(?:[\w.]+/)?(?:p|reels?|tv)/(?P<id>[\w-]+)', 'https://www.instagram.com/p/{id}/'),
+     ]),
+    ('Reddit', 'fab fa-reddit', '#FF4500',
+     ('reddit.com',),
+     [
+         (r'/r/(?P<sub>\w+)/comments/(?P<id>\w+)', 'https://www.reddit.com/r/{sub}/comments/{id}/'),
+         (r'/(?:comments|gallery)/(?P<id>\w+)', 'https://www.reddit.com/comments/{id}/'),
+     ]),
+    ('Reddit', 'fab fa-reddit', '#FF4500',
+     ('v.redd.it',),
+     [
+         (r'/(?P<id>\w+)', 'https://v.redd.it/{id}'),
+     ]),
+    ('Reddit', 'fab fa-reddit', '#FF4500',
+     ('redd.it',),
+     [
+         (r'/(?P<id>\w+)', 'https://www.reddit.com/comments/{id}/'),
+     ]),
+    ('Twitter/X', 'fab fa-twitter', '#1DA1F2',
+     ('twitter.com', 'x.com'),
+     [
+         # 영상이 여러 개인 트윗은 /video/N 으로 고르므로 번호까지 ID에 포함
+         (r'/(?:i/web|\w+)/status(?:es)?/(?P<id>\d+(?:/video/\d+)?)', 'https://x.com/i/status/{id}'),
+         (r'/statuses/(?P<id>\d+(?:/video/\d+)?)', 'https://x.com/i/status/{id}'),
+     ]),
+    ('Threads', 'fab fa-threads', '#000000',
+     ('threads.net', 'threads.com'),
+     [
+         (r'/@(?P<user>[\w.]+)/post/(?P<id>[\w-]+)', 'https://www.threads.net/@{user}/post/{id}'),
+         (r'/(?:t|post)/(?P<id>[\w-]+)', 'https://www.threads.net/t/{id}'),
+     ]),
+    ('Facebook', 'fab fa-facebook', '#1877F2',
+     ('facebook.com', 'fb.com'),
+     [
+         (r'/[^/?#]+/videos/(?:[^/?#]+/)?(?P<id>\d+)', 'https://www.facebook.com/watch/?v={id}'),
+         (r'/(?:video\.php|watch/?)\?(?:[^#]*&)?v=(?P<id>\d+)', 'https://www.facebook.com/watch/?v={id}'),
+         (r'/reel/(?P<id>\d+)', 'https://www.facebook.com/watch/?v={id}'),
+         (r'/share/[vr]/(?P<id>[\w-]+)', None),
+     ]),
+    ('Facebook', 'fab fa-facebook', '#1877F2',
+     ('fb.watch',),
+     [
+         (r'/(?P<id>[\w-]+)', None),
+     ]),
+]
+
+# 플랫폼 이름 (중복 제거, 'Unknown' 포함)
+NAMES = tuple(dict.fromkeys([entry[0] for entry in PLATFORMS] + [UNKNOWN[0]]))
+
+# 스킴(없어도 됨), 사용자 정보, 호스트, 포트, 경로+쿼리
+_URL_RE = re.compile(r'(?:[A-Za-z][\w+.-]*://|//)?(?:[^@/?#\s]*@)?([^/?#:\s]*)(?::\d*)?([^#\s]*)')
+
+
+def _build_index():
+    index = {}
+    for name, icon, color, hosts, patterns in PLATFORMS:
+        compiled = [(re.compile(pattern), template) for pattern, template in patterns]
+        entry = (name, icon, color, compiled)
+        for host in hosts:
+            index[host] = entry
+    return index
+
+
+_HOST_INDEX = _build_index()
+
+# route 결과 캐시 크기 (URL 문자열 기준)
+ROUTE_CACHE_SIZE = 4096
+
+
+def lookup_host(host):
+    """호스트 이름을 점 단위 접미사로 줄여가며 색인에서 찾습니다. 없으면 None.
+
+    라벨 경계에서만 자르므로 'netflix.com'은 'x.com'에 걸리지 않습니다.
+    """
+    host = host.lower().rstrip('.')
+    while True:
+        entry = _HOST_INDEX.get(host)
+        if entry is not None:
+            return entry
+        dot = host.find('.')
+        if dot < 0:
+            return None
+        host = host[dot + 1:]
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def route(url):
+    """URL을 분석해 Route(플랫폼, 아이콘, 색상, 정규화 URL, 영상 ID)를 반환합니다.
+
+    알 수 없는 호스트는 'Unknown', 알려진 호스트지만 영상 경로가 아니면 영상 ID가 None입니다.
+    """
+    url = url.strip()
+    host, target = _URL_RE.match(url).groups()
+    entry = lookup_host(host)
+    if entry is None:
+        return Route(*UNKNOWN, url, None)
+    name, icon, color, patterns = entry
+    if not target.startswith('/'):
+        target = '/' + target
+    for pattern, template in patterns:
+        found = pattern.match(target)
+        if found:
+            video_id = found.group('id')
+            canonical_url = template.format(**found.groupdict()) if template else url
+            return Route(name, icon, color, canonical_url, video_id)
+    return Route(name, icon, color, url, None)
+
+
+def video_key(url):
+    """같은 영상이면 URL 형태와 상관없이 같은 (플랫폼, 영상 ID) 키를 반환합니다. 알 수 없으면 None.
+
+    youtu.be/X, youtube.com/watch?v=X&t=3, youtube.com/shorts/X 는 모두 ('YouTube', 'X') 입니다.
+    x.com/u/status/1/video/2 는 ('Twitter/X', '1/video/2')로, 같은 트윗의 다른 영상과 구분됩니다.
+    """
+    platform, _, _, _, video_id = route(url)
+    if video_id is None:
+        return None
+    return platform, video_id
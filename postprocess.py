@@ -0,0 +1,141 @@
+"""
+다운로드 후처리 계획
+ffprobe로 코덱을 확인해 mp4에 그대로 담을 수 있으면 스트림 복사(remux)만 하고,
+호환되지 않는 코덱이 있을 때만 재인코딩합니다.
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = os.environ.get('FFMPEG_PATH', 'ffmpeg')
+FFPROBE = os.environ.get('FFPROBE_PATH', 'ffprobe')
+
+# mp4 컨테이너에 그대로 넣을 수 있는 코덱
+MP4_VIDEO_CODECS = {'h264', 'hevc', 'av1', 'mpeg4'}
+MP4_AUDIO_CODECS = {'aac', 'mp3', 'alac', 'ac3', 'eac3', 'opus', 'flac'}
+
+# 후처리 경로
+ACTION_NONE = 'none'            # 이미 mp4 + 호환 코덱
+ACTION_REMUX = 'remux'          # 컨테이너만 변경 (스트림 복사)
+ACTION_TRANSCODE = 'transcode'  # 호환되지 않는 코덱 재인코딩
+
+
+class PostprocessError(Exception):
+    """ffmpeg 후처리가 실패했을 때 발생합니다."""
+
+
+def probe(path):
+    """ffprobe로 컨테이너와 첫 비디오/오디오 코덱을 조회합니다. ffprobe가 없으면 None."""
+    if not shutil.which(FFPROBE):
+        return None
+    result = subprocess.run(
+        [FFPROBE, '-v', 'error', '-show_entries', 'format=format_name,duration:stream=codec_type,codec_name',
+         '-of', 'json', path],
+        capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0:
+        raise PostprocessError(f"ffprobe 실패: {result.stderr.strip()}")
+    data = json.loads(result.stdout or '{}')
+    info = {
+        'format_name': data.get('format', {}).get('format_name', ''),
+        'duration': float(data.get('format', {}).get('duration') or 0),
+        'video': None,
+        'audio': None,
+    }
+    for stream in data.get('streams', []):
+        kind = stream.get('codec_type')
+        if kind in ('video', 'audio') and info[kind] is None:
+            info[kind] = stream.get('codec_name')
+    return info
+
+
+def priority(job_plan):
+    """ffmpeg 풀 우선순위. remux가 먼저, 같은 종류 안에서는 짧은 영상이 먼저입니다."""
+    duration = (job_plan['probe'] or {}).get('duration') or 0
+    return (0 if job_plan['action'] != ACTION_TRANSCODE else 1, duration)
+
+
+def plan(path, probed):
+    """(경로 종류, ffmpeg 코덱 인자)를 반환합니다."""
+    video_ok = probed['video'] is None or probed['video'] in MP4_VIDEO_CODECS
+    audio_ok = probed['audio'] is None or probed['audio'] in MP4_AUDIO_CODECS
+    is_mp4 = path.lower().endswith('.mp4') and 'mp4' in probed['format_name']
+    if video_ok and audio_ok:
+        if is_mp4:
+            return ACTION_NONE, []
+        return ACTION_REMUX, ['-c', 'copy']
+    # 호환되는 쪽은 복사하고 문제 있는 스트림만 인코딩
+    args = ['-c:v', 'copy' if video_ok else 'libx264', '-c:a', 'copy' if audio_ok else 'aac']
+    if not video_ok:
+        args += ['-preset', 'veryfast', '-crf', '23']
+    return ACTION_TRANSCODE, args
+
+
+def run_ffmpeg(src, dest, codec_args, extra_args=None):
+    """src를 dest(mp4)로 변환합니다. extra_args는 출력 옵션(-threads 등)입니다."""
+    cmd = [FFMPEG, '-y', '-v', 'error', '-i', src, '-map', '0:v?', '-map', '0:a?']
+    cmd += codec_args + list(extra_args or []) + ['-movflags', '+faststart', dest]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise PostprocessError(f"ffmpeg 실패: {result.stderr.strip()[-500:]}")
+
+
+class PostProcessor:
+    """다운로드된 파일을 mp4로 맞추고 경로별 횟수와 소요 시간을 집계합니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {action: {'count': 0, 'seconds': 0.0}
+                       for action in (ACTION_NONE, ACTION_REMUX, ACTION_TRANSCODE)}
+
+    def plan(self, path):
+        """파일을 조사해 후처리 계획을 만듭니다. ffmpeg는 실행하지 않습니다."""
+        probed = probe(path)
+        if probed is None:
+            logger.warning("ffprobe를 찾을 수 없어 후처리를 건너뜁니다.")
+            return {'path': path, 'action': ACTION_NONE, 'codec_args': [], 'probe': None}
+        action, codec_args = plan(path, probed)
+        return {'path': path, 'action': action, 'codec_args': codec_args, 'probe': probed}
+
+    def execute(self, job_plan, threads=None):
+        """계획대로 처리하고 (최종 경로, 보고서 dict)를 반환합니다."""
+        start = time.perf_counter()
+        path = job_plan['path']
+        action = job_plan['action']
+        final_path = path
+        if action != ACTION_NONE:
+            final_path = os.path.splitext(path)[0] + '.mp4'
+            tmp_path = os.path.splitext(path)[0] + '.pp.mp4'
+            extra_args = ['-threads', str(threads)] if threads else []
+            try:
+                run_ffmpeg(path, tmp_path, job_plan['codec_args'], extra_args)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            os.replace(tmp_path, final_path)
+            if final_path != path:
+                os.remove(path)
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self._stats[action]['count'] += 1
+            self._stats[action]['seconds'] += seconds
+        probed = job_plan['probe'] or {}
+        logger.info(f"후처리 {action}: {os.path.basename(final_path)} "
+                    f"({probed.get('video')}/{probed.get('audio')}, {seconds:.2f}초)")
+        return final_path, {'action': action, 'seconds': seconds, 'probe': job_plan['probe']}
+
+    def process(self, path, threads=None):
+        """계획과 처리를 한 번에 수행합니다."""
+        return self.execute(self.plan(path), threads)
+
+    def stats(self):
+        with self._lock:
+            return {action: dict(values) for action, values in self._stats.items()}
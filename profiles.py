@@ -0,0 +1,149 @@
+"""
+yt-dlp 옵션 프로필 레지스트리
+플랫폼별 옵션을 시작 시 한 번 만들어 변경 불가능한 템플릿으로 보관하고,
+작업마다 outtmpl 같은 필드만 덮어쓴 얕은 사본을 만들어 줍니다.
+
+설정 파일 (PROFILE_CONFIG, JSON) 형식:
+
+    {
+        "*": {"socket_timeout": 20},
+        "YouTube": {"format": "bestvideo[height<=720]+bestaudio/best"},
+        "TikTok": {"retries": 3}
+    }
+
+"*"는 모든 플랫폼에, 플랫폼 이름 키는 해당 플랫폼에만 적용되며 내장 옵션의 최상위 키를 대체합니다.
+값이 null이면 그 키를 내장 옵션에서 제거합니다.
+파일이 바뀌면 (수정 시각 기준) 다음 조회 때 다시 읽으므로 워커를 재시작할 필요가 없습니다.
+읽기에 실패하면 이전 프로필을 그대로 유지합니다.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+
+def freeze(value):
+    """dict는 MappingProxyType, list는 tuple로 재귀 변환합니다."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class ProfileRegistry:
+    """builder(플랫폼)로 만든 옵션을 플랫폼별로 고정해 두고 조회합니다.
+
+    names에 없는 플랫폼은 default 프로필을 씁니다.
+    """
+
+    def __init__(self, builder, names, default='Unknown', config_path=None, check_interval=5):
+        self.builder = builder
+        self.names = tuple(names)
+        self.default = default
+        self.config_path = config_path
+        self.check_interval = check_interval
+        self.version = 0
+        self.loaded_at = None
+        self.reload_errors = 0
+        self._profiles = {}
+        self._config_mtime = None
+        self._last_check = 0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def get(self, platform):
+        """플랫폼의 고정된 옵션 템플릿(읽기 전용)을 반환합니다."""
+        self._maybe_reload()
+        return MappingProxyType(self._template(platform))
+
+    def options(self, platform, **overrides):
+        """템플릿 위에 overrides를 얹은 yt-dlp용 dict를 반환합니다.
+
+        최상위만 복사하므로 가볍고, 중첩 값은 템플릿과 공유하는 읽기 전용 객체입니다.
+        yt-dlp가 params를 수정해도 템플릿에는 영향이 없습니다.
+        """
+        self._maybe_reload()
+        options = self._template(platform).copy()
+        options.update(overrides)
+        return options
+
+    def current_version(self):
+        """설정 파일이 바뀌었으면 다시 읽은 뒤 현재 프로필 버전을 반환합니다.
+
+        템플릿을 조회하지 않고 버전만 확인하는 쪽(ydl_pool)도 변경을 알아챌 수 있게 합니다.
+        """
+        self._maybe_reload()
+        return self.version
+
+    def reload(self):
+        """내장 옵션과 설정 파일로 모든 프로필을 다시 만듭니다. 성공하면 True."""
+        with self._lock:
+            try:
+                config, mtime = self._read_config()
+                profiles = {}
+                for name in self.names:
+                    options = self.builder(name)
+                    for section in ('*', name):
+                        for key, value in config.get(section, {}).items():
+                            if value is None:
+                                options.pop(key, None)
+                            else:
+                                options[key] = value
+                    # 최상위는 일반 dict로 두어 options()의 복사를 빠르게 한다
+                    profiles[name] = {key: freeze(value) for key, value in options.items()}
+            except Exception as e:
+                self.reload_errors += 1
+                logger.error(f"옵션 프로필을 다시 읽지 못했습니다: {str(e)}")
+                return False
+            self._profiles = profiles
+            self._config_mtime = mtime
+            self.version += 1
+            self.loaded_at = time.time()
+        if self.version > 1:
+            logger.info(f"옵션 프로필 다시 읽음 (버전 {self.version})")
+        return True
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'config_path': self.config_path,
+            'reload_errors': self.reload_errors,
+            'profiles': sorted(self._profiles),
+        }
+
+    def _template(self, platform):
+        profiles = self._profiles
+        return profiles.get(platform) or profiles[self.default]
+
+    def _read_config(self):
+        if not self.config_path or not os.path.exists(self.config_path):
+            return {}, None
+        mtime = os.path.getmtime(self.config_path)
+        with open(self.config_path, encoding='utf-8') as f:
+            config = json.load(f)
+        if not isinstance(config, dict) or not all(isinstance(v, dict) for v in config.values()):
+            raise ValueError("설정 파일은 {플랫폼: {옵션: 값}} 형식이어야 합니다.")
+        return config, mtime
+
+    def _maybe_reload(self):
+        if not self.config_path:
+            return
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            mtime = None
+        if mtime != self._config_mtime:
+            # 실패해도 같은 파일을 매번 다시 읽지 않도록 먼저 기록
+            self._config_mtime = mtime
+            self.reload()
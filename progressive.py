@@ -0,0 +1,114 @@
+"""
+다운로드 중 스트리밍
+yt-dlp가 디스크에 쓰고 있는 파일을 따라 읽어, 다운로드가 끝나기 전부터 클라이언트에 바이트를 보냅니다.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def is_progressive(info):
+    """후처리 없이 그대로 전달할 수 있는 단일 파일(mp4, HTTP) 포맷인지 확인합니다."""
+    return (
+        not info.get('requested_formats')
+        and info.get('protocol') in ('http', 'https')
+        and info.get('ext') == 'mp4'
+    )
+
+
+class ProgressiveFile:
+    """yt-dlp progress hook으로 쓰기 진행 상황을 받아 읽는 쪽을 깨웁니다."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.path = None
+        self.filename = None  # .part가 아닌 최종 파일 이름
+        self.total_bytes = None
+        self.downloaded_bytes = 0
+        self.readable_bytes = None  # 분할 다운로드면 앞에서부터 채워진 바이트 수, 아니면 None
+        self.finished = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def hook(self, d):
+        """yt-dlp progress hook."""
+        with self._cond:
+            if self.path is None:
+                self.path = d.get('tmpfilename') or d.get('filename')
+            self.filename = d.get('filename') or self.filename
+            self.total_bytes = d.get('total_bytes') or self.total_bytes
+            self.downloaded_bytes = d.get('downloaded_bytes') or self.downloaded_bytes
+            if d.get('contiguous_bytes') is not None:
+                self.readable_bytes = d['contiguous_bytes']
+            if d.get('status') == 'finished':
+                self.finished = True
+            elif d.get('status') == 'error':
+                self.error = "다운로드 중 오류가 발생했습니다."
+            self._cond.notify_all()
+
+    def fail(self, error):
+        with self._cond:
+            self.error = str(error)
+            self._cond.notify_all()
+
+    def wait_ready(self, timeout):
+        """쓰기가 시작되어 읽을 수 있게 되면 True를 반환합니다."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.path is None and self.error is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return self.path is not None and self.error is None
+
+    def open(self):
+        """읽을 파일을 엽니다. .part가 이미 최종 이름으로 바뀌었으면 최종 파일을 엽니다."""
+        try:
+            return open(self.path, 'rb')
+        except FileNotFoundError:
+            if not self.filename or self.filename == self.path:
+                raise
+            return open(self.filename, 'rb')
+
+    def iter_bytes(self, chunk_size=256 * 1024, idle_timeout=60):
+        """파일이 커지는 대로 읽어 내보내는 이터레이터를 반환합니다.
+
+        파일은 이 메서드를 호출할 때(응답을 만들 때) 바로 열므로, 그 뒤 .part의 이름이 바뀌어도
+        끝까지 읽을 수 있습니다. 파일이 없으면 FileNotFoundError가 여기서 발생합니다.
+        다운로드가 끝나면 남은 바이트까지 보내고 종료합니다.
+        """
+        return self._follow(self.open(), chunk_size, idle_timeout)
+
+    def _follow(self, f, chunk_size, idle_timeout):
+        """분할 다운로드는 파일 크기를 미리 잡아두므로 빈틈없이 채워진 곳(readable_bytes)까지만 읽습니다."""
+        with f:
+            last_progress = time.monotonic()
+            while True:
+                size = chunk_size
+                if self.readable_bytes is not None and not self.finished:
+                    size = min(chunk_size, self.readable_bytes - f.tell())
+                data = f.read(size) if size > 0 else b''
+                if data:
+                    last_progress = time.monotonic()
+                    yield data
+                    continue
+                with self._cond:
+                    finished = self.finished
+                    error = self.error
+                    if not finished and error is None:
+                        self._cond.wait(1.0)
+                if finished:
+                    # 'finished' hook은 파일을 닫은 뒤 호출되므로 남은 바이트만 마저 보낸다
+                    for data in iter(lambda: f.read(chunk_size), b''):
+                        yield data
+                    return
+                if error is not None:
+                    logger.warning(f"스트리밍 중단: {error}")
+                    return
+                if time.monotonic() - last_progress > idle_timeout:
+                    logger.warning(f"스트리밍 중단: {idle_timeout}초 동안 데이터가 없습니다.")
+                    return
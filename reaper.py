@@ -0,0 +1,154 @@
+"""
+다운로드 폴더 정리기
+용량 한도와 최대 보관 시간을 넘는 파일을 가장 오래 전달되지 않은 것부터 지웁니다.
+폴더 전체를 매번 훑지 않고 메모리 인덱스로 관리하며, 전송 중인 파일은 건드리지 않습니다.
+"""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DiskReaper:
+    """백그라운드 스레드에서 주기적으로 DOWNLOAD_FOLDER를 정리합니다.
+
+    in_use(filename)가 참이면 삭제하지 않고, 삭제 후에는 on_evict(filename)를 호출합니다.
+    """
+
+    def __init__(self, folder, max_bytes, max_age, interval=60, rescan_interval=3600,
+                 active_grace=300, in_use=None, on_evict=None):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.active_grace = active_grace  # 최근 수정된 파일은 다운로드 중일 수 있으므로 보호
+        self.in_use = in_use or (lambda filename: False)
+        self.on_evict = on_evict
+        self._index = {}  # filename -> [size, last_used]
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_rescan = 0
+        self.sweeps = 0
+        self.evicted_files = 0
+        self.freed_bytes = 0
+        self.last_sweep = None
+        self.rescan()
+
+    def track(self, filename):
+        """새로 완성된 파일을 인덱스에 추가합니다."""
+        try:
+            size = os.path.getsize(os.path.join(self.folder, filename))
+        except OSError:
+            return
+        with self._lock:
+            self._index[filename] = [size, time.time()]
+
+    def touch(self, filename):
+        """파일이 전달되었음을 기록합니다."""
+        with self._lock:
+            entry = self._index.get(filename)
+            if entry:
+                entry[1] = time.time()
+                return
+        self.track(filename)
+
+    def rescan(self):
+        """폴더를 한 번 훑어 인덱스에 없는 파일(이전 실행의 잔여물 등)을 추가합니다."""
+        found = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.') or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    found[entry.name] = [stat.st_size, stat.st_mtime]
+        except OSError as e:
+            logger.warning(f"다운로드 폴더를 읽을 수 없습니다: {str(e)}")
+            return
+        with self._lock:
+            for filename in list(self._index):
+                if filename not in found:
+                    del self._index[filename]
+            for filename, entry in found.items():
+                self._index.setdefault(filename, entry)
+        self._last_rescan = time.time()
+
+    def sweep(self):
+        """한도를 넘는 파일을 지우고 확보한 바이트 수를 반환합니다."""
+        now = time.time()
+        if now - self._last_rescan >= self.rescan_interval:
+            self.rescan()
+        with self._lock:
+            candidates = sorted(self._index.items(), key=lambda item: item[1][1])
+            total = sum(size for size, _ in self._index.values())
+        freed = 0
+        for filename, (size, last_used) in candidates:
+            expired = now - last_used > self.max_age
+            if not expired and total <= self.max_bytes:
+                break
+            if self.in_use(filename) or self._recently_modified(filename, now):
+                continue
+            if self._evict(filename):
+                total -= size
+                freed += size
+        self.sweeps += 1
+        self.last_sweep = now
+        if freed:
+            logger.info(f"다운로드 폴더 정리: {freed / 1024 / 1024:.1f}MB 확보")
+        return freed
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='disk-reaper', daemon=True)
+            self._thread.start()
+
+    def stats(self):
+        with self._lock:
+            tracked_bytes = sum(size for size, _ in self._index.values())
+            tracked_files = len(self._index)
+        return {
+            'max_bytes': self.max_bytes,
+            'max_age': self.max_age,
+            'tracked_files': tracked_files,
+            'tracked_bytes': tracked_bytes,
+            'sweeps': self.sweeps,
+            'evicted_files': self.evicted_files,
+            'freed_bytes': self.freed_bytes,
+            'last_sweep': self.last_sweep,
+        }
+
+    def _recently_modified(self, filename, now):
+        try:
+            return now - os.path.getmtime(os.path.join(self.folder, filename)) < self.active_grace
+        except OSError:
+            return False
+
+    def _evict(self, filename):
+        path = os.path.join(self.folder, filename)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            size = 0
+        except OSError as e:
+            logger.warning(f"파일 삭제 실패: {filename} - {str(e)}")
+            return False
+        with self._lock:
+            self._index.pop(filename, None)
+            self.evicted_files += 1
+            self.freed_bytes += size
+        if self.on_evict:
+            self.on_evict(filename)
+        return True
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"다운로드 폴더 정리 실패: {str(e)}")
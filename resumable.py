@@ -0,0 +1,254 @@
+"""
+이어받기 다운로드
+받는 중인 내용은 <파일>.part 에, 원본 정보(URL, ETag, Last-Modified, 전체 길이)는
+<파일>.part.json 사이드카에 남깁니다. 연결이 끊기면 받은 곳부터 Range 요청으로 이어받고,
+프로세스가 다시 실행되어도 사이드카가 같은 영상을 가리키면 이어서 받습니다.
+끝나면 길이를 확인한 뒤 최종 파일 이름으로 바꿉니다.
+본문은 재사용하는 버퍼에 readinto로 읽고, 읽는 크기는 측정한 속도에 맞춰 수 MB까지 늘립니다.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+import requests
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+logger = logging.getLogger(__name__)
+
+# (연결, 읽기) 타임아웃 (초)
+TIMEOUT = (10, 30)
+
+# 처음 읽는 크기와 속도에 따라 조정하는 범위
+CHUNK_SIZE = 64 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+
+# 한 번 읽는 데 걸리면 좋을 시간 (초)
+TARGET_READ_SECONDS = 0.25
+
+# 진행률 콜백을 호출하는 최소 간격 (초)
+PROGRESS_INTERVAL = 0.5
+
+# 응답 도중 끊겼을 때 이어받기를 시도하는 횟수
+RETRIES = 5
+
+# 이어받기 가능한 일시적 오류 (4xx/5xx 응답은 포함하지 않음, 5xx는 세션의 재시도 어댑터가 처리)
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    Urllib3HTTPError)
+
+_CONTENT_RANGE_RE = re.compile(r'bytes (\d+)-\d+/(\d+|\*)')
+
+
+class IncompleteDownloadError(Exception):
+    """재시도 후에도 전체 길이만큼 받지 못했을 때 발생합니다."""
+
+
+class ChunkSizer:
+    """측정한 읽기 속도에 맞춰 한 번에 읽을 크기를 정합니다.
+
+    한 번 읽는 데 target초쯤 걸리도록, 읽을 때마다 2배로 늘리거나 절반으로 줄입니다
+    (minimum~maximum). 빠른 연결에서는 반복과 write 호출이 줄고,
+    느린 연결에서는 진행률 갱신과 끊김 감지가 늦어지지 않습니다.
+    """
+
+    def __init__(self, initial=CHUNK_SIZE, minimum=MIN_CHUNK_SIZE, maximum=MAX_CHUNK_SIZE,
+                 target=TARGET_READ_SECONDS):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target
+        self.size = min(max(initial, minimum), maximum)
+
+    def update(self, nbytes, seconds):
+        # 요청보다 짧은 읽기(본문 끝)는 속도를 알 수 없으므로 무시
+        if nbytes < self.size:
+            return
+        if seconds * 2 < self.target:
+            self.size = min(self.size * 2, self.maximum)
+        elif seconds > self.target * 2:
+            self.size = max(self.size // 2, self.minimum)
+
+
+class ProgressThrottle:
+    """progress(받은 바이트, 전체 바이트)를 interval초에 한 번만 호출합니다."""
+
+    def __init__(self, callback, interval=PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self._last = None
+
+    def __call__(self, downloaded, total):
+        now = time.monotonic()
+        if self._last is None or now - self._last >= self.interval:
+            self._last = now
+            self.callback(downloaded, total)
+
+    def flush(self, downloaded, total):
+        """마지막 값은 간격과 관계없이 전달합니다."""
+        self._last = time.monotonic()
+        self.callback(downloaded, total)
+
+
+def part_paths(path):
+    return path + '.part', path + '.part.json'
+
+
+def _read_sidecar(sidecar):
+    try:
+        with open(sidecar, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_sidecar(sidecar, meta):
+    tmp = sidecar + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp, sidecar)
+
+
+def _discard(part, sidecar):
+    for stale in (part, sidecar):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+
+def _same_source(meta, url):
+    """사이드카가 같은 영상을 가리키는지 확인합니다.
+
+    서명된 CDN URL은 다시 추출하면 쿼리가 바뀌므로, 경로가 같고 검증자(ETag/Last-Modified)가
+    있으면 같은 영상으로 보고 If-Range로 서버에 최종 확인을 맡긴다.
+    """
+    if not meta:
+        return False
+    if meta.get('url') == url:
+        return True
+    return (urlsplit(meta.get('url', '')).path == urlsplit(url).path
+            and bool(meta.get('etag') or meta.get('last_modified')))
+
+
+def download_resumable(session, url, path, headers=None, progress=None,
+                       retries=RETRIES, timeout=TIMEOUT, chunk_size=CHUNK_SIZE):
+    """url을 path에 받고 받은 전체 바이트 수를 반환합니다.
+
+    progress(받은 바이트, 전체 바이트)는 PROGRESS_INTERVAL초에 한 번과 끝났을 때 호출됩니다
+    (전체를 모르면 0). chunk_size는 처음 읽는 크기이고 이후에는 ChunkSizer가 조정합니다.
+    재시도 후에도 받지 못하면 .part와 사이드카를 남긴 채 예외를 던지므로, 다음 호출이 이어받습니다.
+    """
+    part, sidecar = part_paths(path)
+    meta = _read_sidecar(sidecar)
+    if not (_same_source(meta, url) and os.path.exists(part)):
+        meta = None
+        _discard(part, sidecar)
+
+    throttle = ProgressThrottle(progress) if progress else None
+    sizer = ChunkSizer(chunk_size)
+    # 재시도에서도 같은 버퍼를 쓴다
+    buffer = bytearray(sizer.maximum)
+    attempt = 0
+    while True:
+        offset = os.path.getsize(part) if meta and os.path.exists(part) else 0
+        try:
+            total = _fetch(session, url, part, sidecar, meta, offset, headers, throttle, timeout, sizer, buffer)
+            if total is None or os.path.getsize(part) >= total:
+                break
+            raise IncompleteDownloadError(f"{os.path.getsize(part)}/{total}바이트만 받았습니다.")
+        except (IncompleteDownloadError,) + TRANSIENT_ERRORS as e:
+            attempt += 1
+            if attempt > retries:
+                raise
+            logger.warning(f"다운로드가 끊겨 이어받습니다 ({attempt}/{retries}, "
+                           f"{os.path.getsize(part) if os.path.exists(part) else 0}바이트부터): {str(e)}")
+            time.sleep(min(2 ** (attempt - 1), 10) * 0.5)
+        meta = _read_sidecar(sidecar)
+
+    size = os.path.getsize(part)
+    if total is not None and size != total:
+        raise IncompleteDownloadError(f"길이가 맞지 않습니다: {size} != {total}")
+    os.replace(part, path)
+    os.remove(sidecar)
+    if throttle:
+        throttle.flush(size, total or 0)
+    return size
+
+
+def _fetch(session, url, part, sidecar, meta, offset, headers, progress, timeout, sizer, buffer):
+    """offset부터 한 번 요청해 .part에 이어 씁니다. 전체 길이(모르면 None)를 반환합니다."""
+    request_headers = dict(headers or {})
+    # 압축된 응답이면 바이트 위치가 맞지 않으므로 원본 그대로 받는다
+    request_headers['Accept-Encoding'] = 'identity'
+    if offset:
+        request_headers['Range'] = f'bytes={offset}-'
+        validator = meta.get('etag') or meta.get('last_modified')
+        if validator:
+            # 그 사이 파일이 바뀌었으면 서버가 206 대신 전체를 200으로 보낸다
+            request_headers['If-Range'] = validator
+
+    with session.get(url, headers=request_headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416 and offset:
+            if offset == meta.get('length'):
+                # 이미 다 받아 두었음
+                return offset
+            # 받아 둔 내용이 서버 파일보다 길다 -> 처음부터 다시
+            open(part, 'wb').close()
+            raise IncompleteDownloadError("받아 둔 위치가 파일 길이를 넘어 처음부터 받습니다.")
+        response.raise_for_status()
+
+        if offset and response.status_code == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+            if not match or int(match.group(1)) != offset:
+                # 같은 위치로 다시 요청해도 마찬가지이므로 받아 둔 내용을 버리고 처음부터 받는다
+                _discard(part, sidecar)
+                raise IncompleteDownloadError(f"요청한 위치와 다른 응답이라 처음부터 받습니다: "
+                                              f"{response.headers.get('Content-Range')}")
+            total = int(match.group(2)) if match.group(2) != '*' else None
+            mode = 'ab'
+        else:
+            if offset:
+                logger.info("서버가 이어받기를 지원하지 않거나 파일이 바뀌어 처음부터 받습니다.")
+            offset = 0
+            length = response.headers.get('Content-Length')
+            total = int(length) if length and length.isdigit() else None
+            mode = 'wb'
+
+        if mode == 'wb' or not meta or meta.get('url') != url:
+            _write_sidecar(sidecar, {
+                'url': url,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'length': total,
+            })
+
+        downloaded = offset
+        with open(part, mode) as f:
+            for chunk in _iter_chunks(response, sizer, buffer):
+                f.write(chunk)
+                downloaded += len(chunk)
+                if progress:
+                    progress(downloaded, total or 0)
+    return total
+
+
+def _iter_chunks(response, sizer, buffer):
+    """본문을 buffer에 readinto로 읽어 memoryview 조각으로 돌려줍니다.
+
+    조각은 다음 읽기에서 덮어쓰므로 다음 조각을 받기 전에 써야 합니다.
+    """
+    if response.headers.get('Content-Encoding', 'identity').lower() != 'identity':
+        # identity를 무시하고 압축해 보낸 경우에만 requests의 디코딩 경로를 사용
+        yield from response.iter_content(sizer.size)
+        return
+    view = memoryview(buffer)
+    readinto = response.raw.readinto
+    while True:
+        size = sizer.size
+        started = time.monotonic()
+        count = readinto(view[:size])
+        if not count:
+            return
+        sizer.update(count, time.monotonic() - started)
+        yield view[:count]
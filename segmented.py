@@ -0,0 +1,203 @@
+"""
+다중 연결 분할 다운로더
+단일 파일(progressive) 포맷의 전체 길이를 N개 구간으로 나누어 동시에 받고,
+미리 크기를 잡아둔 파일의 각 위치에 pwrite로 씁니다.
+실패한 구간만 이어받기로 재시도하고, 끝내 실패하면 .part를 앞의 연속된 부분까지만 남깁니다.
+
+서버가 Range를 지원하지 않거나 길이를 알 수 없으면 yt-dlp 기본 HTTP 다운로더로 받습니다.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import ContentTooShortError, parse_http_range
+from yt_dlp.utils.networking import HTTPHeaderDict
+
+# 이보다 작은 파일은 연결을 나누는 이득이 없으므로 한 연결로 받는다
+MIN_SEGMENT_SIZE = 1024 * 1024
+
+# 한 번에 읽어 쓰는 크기
+BLOCK_SIZE = 256 * 1024
+
+# 진행 상황을 알리는 간격 (초)
+PROGRESS_INTERVAL = 0.5
+
+
+class SegmentError(Exception):
+    """구간 응답이 요청한 범위와 맞지 않을 때 발생합니다."""
+
+
+class Segment:
+    """[start, end] 구간 하나. pos는 다음에 받을 위치입니다."""
+
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.pos = start
+        self.attempts = 0
+
+    @property
+    def done(self):
+        return self.pos > self.end
+
+
+def split_ranges(total, connections, min_size=MIN_SEGMENT_SIZE):
+    """total 바이트를 최대 connections개의 연속 구간으로 나눕니다."""
+    count = max(1, min(connections, total // min_size))
+    size = -(-total // count)
+    return [Segment(i, start, min(start + size, total) - 1)
+            for i, start in enumerate(range(0, total, size))]
+
+
+def contiguous_bytes(segments, total):
+    """파일 앞에서부터 빈틈없이 받은 바이트 수."""
+    return next((segment.pos for segment in segments if not segment.done), total)
+
+
+class SegmentedFD(HttpFD):
+    """params['segment_connections']개의 연결로 나누어 받는 HTTP 다운로더.
+
+    진행 상황 dict의 contiguous_bytes는 파일 앞에서부터 빈틈없이 채워진 바이트 수로,
+    다운로드 중 스트리밍은 이 범위까지만 읽어야 합니다.
+    """
+
+    FD_NAME = 'segmented'
+
+    def real_download(self, filename, info_dict):
+        connections = self.params.get('segment_connections') or 1
+        headers = HTTPHeaderDict({'Accept-Encoding': 'identity'}, info_dict.get('http_headers'))
+        if connections < 2 or self.params.get('test') or 'Range' in headers or info_dict.get('request_data'):
+            return super().real_download(filename, info_dict)
+
+        url = info_dict['url']
+        total = self._probe_length(url, headers)
+        if not total or total < 2 * MIN_SEGMENT_SIZE:
+            return super().real_download(filename, info_dict)
+
+        segments = split_ranges(total, connections)
+        tmpfilename = self.temp_name(filename)
+        self.report_destination(filename)
+        fd = os.open(tmpfilename, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        ok = False
+        try:
+            self._preallocate(fd, total)
+            ok = self._run(fd, url, headers, segments, total, filename, tmpfilename, info_dict)
+        finally:
+            if not ok:
+                # 구멍 난 전체 크기 .part가 남으면 다음 시도(HttpFD)가 그 크기를 이어받을 위치로 보고
+                # 416을 받거나 다 받은 파일로 여긴다. 앞에서부터 빈틈없이 받은 부분만 남긴다
+                os.ftruncate(fd, contiguous_bytes(segments, total))
+            os.close(fd)
+        if not ok:
+            return False
+
+        self.try_rename(tmpfilename, filename)
+        self._hook_progress({
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'contiguous_bytes': total,
+            'filename': filename,
+            'status': 'finished',
+            'elapsed': time.time() - self._start_time,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
+        return True
+
+    def _probe_length(self, url, headers):
+        """1바이트 Range 요청으로 전체 길이와 Range 지원 여부를 확인합니다. 안 되면 None."""
+        request = Request(url, headers=HTTPHeaderDict(headers, {'Range': 'bytes=0-0'}))
+        try:
+            response = self.ydl.urlopen(request)
+        except (HTTPError, TransportError) as e:
+            self.ydl.write_debug(f'segmented: range probe failed, falling back: {e}')
+            return None
+        try:
+            if response.status != 206:
+                return None
+            _, _, total = parse_http_range(response.headers.get('Content-Range'))
+            return total
+        finally:
+            response.close()
+
+    @staticmethod
+    def _preallocate(fd, total):
+        try:
+            os.posix_fallocate(fd, 0, total)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, total)
+
+    def _run(self, fd, url, headers, segments, total, filename, tmpfilename, info_dict):
+        self._start_time = time.time()
+        stop = threading.Event()
+        retries = self.params.get('retries', 10)
+        if retries == float('inf'):
+            retries = 10 ** 9
+
+        def fetch(segment):
+            while True:
+                segment.attempts += 1
+                try:
+                    self._fetch_segment(fd, url, headers, segment, stop)
+                    return
+                except (HTTPError, TransportError, ContentTooShortError, SegmentError, OSError) as e:
+                    if segment.attempts > retries or stop.is_set():
+                        raise
+                    # 받은 위치부터 이 구간만 다시 요청
+                    self.to_screen(f'[segmented] 구간 {segment.index} 재시도 '
+                                   f'({segment.attempts}/{retries}, {segment.pos - segment.start}바이트부터): {e}')
+                    time.sleep(min(2 ** (segment.attempts - 1), 10) * 0.1)
+
+        with ThreadPoolExecutor(max_workers=len(segments), thread_name_prefix='segment') as executor:
+            futures = [executor.submit(fetch, segment) for segment in segments]
+            pending = futures
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_EXCEPTION)
+                for future in done:
+                    if future.exception() is not None:
+                        # 한 구간이 끝내 실패하면 나머지도 멈춘다
+                        stop.set()
+                        self.report_error(f'구간 다운로드 실패: {future.exception()}')
+                        return False
+                self._report(segments, total, filename, tmpfilename, info_dict)
+        return True
+
+    def _fetch_segment(self, fd, url, headers, segment, stop):
+        request = Request(url, headers=HTTPHeaderDict(headers, {'Range': f'bytes={segment.pos}-{segment.end}'}))
+        response = self.ydl.urlopen(request)
+        try:
+            start, _, _ = parse_http_range(response.headers.get('Content-Range'))
+            if response.status != 206 or start != segment.pos:
+                raise SegmentError(f'요청한 범위와 다른 응답입니다 (HTTP {response.status}, {start} != {segment.pos})')
+            while not segment.done:
+                if stop.is_set():
+                    raise SegmentError('다른 구간이 실패해 중단합니다.')
+                data = response.read(min(BLOCK_SIZE, segment.end - segment.pos + 1))
+                if not data:
+                    raise ContentTooShortError(segment.pos - segment.start, segment.end - segment.start + 1)
+                segment.pos += os.pwrite(fd, data, segment.pos)
+        finally:
+            response.close()
+
+    def _report(self, segments, total, filename, tmpfilename, info_dict):
+        downloaded = sum(segment.pos - segment.start for segment in segments)
+        contiguous = contiguous_bytes(segments, total)
+        elapsed = time.time() - self._start_time
+        speed = downloaded / elapsed if elapsed > 0 else None
+        self._hook_progress({
+            'status': 'downloading',
+            'downloaded_bytes': downloaded,
+            'total_bytes': total,
+            'contiguous_bytes': contiguous,
+            'tmpfilename': tmpfilename,
+            'filename': filename,
+            'eta': (total - downloaded) / speed if speed else None,
+            'speed': speed,
+            'elapsed': elapsed,
+            'ctx_id': info_dict.get('ctx_id'),
+        }, info_dict)
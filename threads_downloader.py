@@ -2,18 +2,33 @@
 """
 Threads.net 동영상 다운로더
 yt-dlp가 지원하지 않는 경우를 위한 대체 스크립트
+영상은 .part 파일에 받으며 연결이 끊기거나 다시 실행하면 받은 곳부터 이어받습니다.
+
+일괄 모드(--batch)는 파일이나 표준 입력의 URL들을 스레드 풀에서 동시에 추출/다운로드하고
+(호스트별 동시 요청 수 제한), URL마다 결과와 소요 시간을 JSONL 매니페스트로 남깁니다.
 """
 
+import argparse
 import re
 import requests
 import json
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from urllib.parse import urlparse, parse_qs
 
-def extract_threads_video(url):
-    """Threads URL에서 동영상을 추출합니다."""
-    print(f"🔍 Threads URL 분석 중: {url}")
+import platforms
+from http_session import get_session
+from resumable import download_resumable
+from threads_scan import find_video_urls, read_page
+
+def extract_threads_video(url, quiet=False):
+    """Threads URL에서 동영상을 추출합니다. quiet면 진행 상황을 출력하지 않습니다."""
+    if not quiet:
+        print(f"🔍 Threads URL 분석 중: {url}")
     
     # Threads URL 패턴 확인
     if 'threads.net' not in url:
@@ -30,30 +45,15 @@ def extract_threads_video(url):
     }
     
     try:
-        # 페이지 다운로드
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        html_content = response.text
+        # 페이지 다운로드 (조각 단위로 훑다가 확실한 동영상 URL이 나오면 나머지는 받지 않음)
+        with get_session().get(url, headers=headers, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            page = read_page(response)
         
-        # 동영상 URL 패턴 찾기
-        video_patterns = [
-            r'"video_url":"([^"]+)"',
-            r'"videoUrl":"([^"]+)"',
-            r'"playable_url":"([^"]+)"',
-            r'"src":"([^"]+\.mp4[^"]*)"',
-            r'<video[^>]+src="([^"]+)"',
-        ]
+        html_content = page.text
         
-        video_url = None
-        for pattern in video_patterns:
-            match = re.search(pattern, html_content)
-            if match:
-                video_url = match.group(1)
-                # 이스케이프 문자 처리
-                video_url = video_url.replace('\\/', '/')
-                video_url = video_url.replace('\\u0025', '%')
-                break
+        # 점수가 가장 높은 동영상 URL 후보 사용 (이스케이프 처리 포함)
+        video_url = page.candidates[0] if page.candidates else None
         
         if not video_url:
             # JavaScript 렌더링된 콘텐츠에서 찾기
@@ -63,14 +63,19 @@ def extract_threads_video(url):
             if json_match:
                 try:
                     data = json.loads(json_match.group(1))
-                    # 데이터 구조 탐색하여 비디오 URL 찾기
-                    # (Threads의 데이터 구조는 복잡하고 자주 변경됨)
-                    print("⚠️  JavaScript 데이터에서 동영상을 찾는 중...")
+                    # 데이터 구조 탐색하여 해상도가 가장 높은 비디오 URL 찾기
+                    # (Threads의 데이터 구조는 복잡하고 자주 변경되므로 미디어 키만 확인)
+                    if not quiet:
+                        print("⚠️  JavaScript 데이터에서 동영상을 찾는 중...")
+                    found = find_video_urls(data)
+                    if found:
+                        video_url = found[0].url
                 except:
                     pass
         
         if video_url:
-            print(f"✅ 동영상 URL 발견: {video_url[:50]}...")
+            if not quiet:
+                print(f"✅ 동영상 URL 발견: {video_url[:50]}...")
             return video_url
         else:
             raise ValueError("동영상 URL을 찾을 수 없습니다. Threads가 구조를 변경했을 수 있습니다.")
@@ -80,31 +85,31 @@ def extract_threads_video(url):
     except Exception as e:
         raise Exception(f"오류 발생: {str(e)}")
 
+def fetch_video(video_url, output_path, progress=None):
+    """동영상을 output_path에 저장하고 받은 바이트 수를 반환합니다. 실패하면 예외가 발생합니다.
+
+    받는 동안은 output_path.part에 쓰고, 연결이 끊기면 받은 곳부터 Range로 이어받습니다.
+    progress(받은 바이트, 전체 바이트)는 조각마다가 아니라 resumable.PROGRESS_INTERVAL초에 한 번,
+    그리고 다운로드가 끝났을 때 한 번 더 호출됩니다.
+    """
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    }
+    
+    # 페이지를 받은 세션의 연결을 재사용
+    return download_resumable(get_session(), video_url, output_path, headers=headers, progress=progress)
+
 def download_video(video_url, output_path):
     """동영상을 다운로드합니다."""
     print(f"📥 동영상 다운로드 중...")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-    }
+    def show_progress(downloaded, total_size):
+        if total_size > 0:
+            progress = (downloaded / total_size) * 100
+            print(f"\r진행률: {progress:.1f}%", end='', flush=True)
     
     try:
-        response = requests.get(video_url, headers=headers, stream=True)
-        response.raise_for_status()
-        
-        # 파일 크기 확인
-        total_size = int(response.headers.get('content-length', 0))
-        
-        with open(output_path, 'wb') as f:
-            downloaded = 0
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total_size > 0:
-                        progress = (downloaded / total_size) * 100
-                        print(f"\r진행률: {progress:.1f}%", end='', flush=True)
-        
+        fetch_video(video_url, output_path, show_progress)
         print(f"\n✅ 다운로드 완료: {output_path}")
         return True
         
@@ -112,21 +117,149 @@ def download_video(video_url, output_path):
         print(f"\n❌ 다운로드 실패: {str(e)}")
         return False
 
+class HostLimiter:
+    """호스트별 동시 요청 수를 per_host개로 제한합니다."""
+    
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def limit(self, url):
+        host = urlparse(url).hostname or ''
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+        with semaphore:
+            yield
+
+def read_urls(source):
+    """파일('-'이면 표준 입력)에서 URL을 읽습니다. 빈 줄, #으로 시작하는 줄, 중복은 건너뜁니다."""
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        urls = []
+        seen = set()
+        for line in f:
+            url = line.strip()
+            if url and not url.startswith('#') and url not in seen:
+                seen.add(url)
+                urls.append(url)
+        return urls
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def output_path_for(url, output_dir):
+    """게시물 코드로 파일명을 정합니다 (다시 실행해도 같은 파일명)."""
+    key = platforms.video_key(url)
+    name = key[1] if key else os.urandom(4).hex()
+    return os.path.join(output_dir, f"threads_video_{name}.mp4")
+
+def plan_downloads(urls, output_dir):
+    """URL마다 저장할 경로를 정해 [(URL, 경로)]를 반환합니다.
+
+    같은 게시물의 다른 URL 형태(/@u/post/X, /t/X, ?xmt=...)는 같은 파일(.part)에 동시에
+    쓰게 되므로, 경로가 겹치면 처음 나온 URL만 남깁니다.
+    """
+    jobs = {}
+    for url in urls:
+        path = output_path_for(url, output_dir)
+        if path in jobs:
+            print(f"⏭️  같은 게시물이라 건너뜀: {url} (= {jobs[path]})", file=sys.stderr)
+        else:
+            jobs[path] = url
+    return [(url, path) for path, url in jobs.items()]
+
+def process_url(url, path, limiter):
+    """URL 하나를 추출하고 다운로드한 결과(매니페스트 한 줄)를 반환합니다. 예외를 던지지 않습니다."""
+    result = {'url': url, 'status': 'error'}
+    started = time.monotonic()
+    try:
+        with limiter.limit(url):
+            video_url = extract_threads_video(url, quiet=True)
+        result['video_url'] = video_url
+        result['extract_seconds'] = round(time.monotonic() - started, 3)
+        
+        download_started = time.monotonic()
+        # 영상은 CDN 호스트 기준으로 따로 제한
+        with limiter.limit(video_url):
+            result['bytes'] = fetch_video(video_url, path)
+        result['download_seconds'] = round(time.monotonic() - download_started, 3)
+        result['path'] = path
+        result['status'] = 'ok'
+    except Exception as e:
+        # 받다 만 .part 파일은 남겨 두어 다시 실행하면 이어받음
+        result['error'] = str(e)
+    result['total_seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+def run_batch(jobs, workers, per_host, manifest):
+    """plan_downloads의 (URL, 경로)들을 workers개 스레드로 동시에 처리하고 끝나는 순서대로 매니페스트에 씁니다.
+
+    성공 수를 반환합니다.
+    """
+    limiter = HostLimiter(per_host)
+    succeeded = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='threads-batch') as executor:
+        futures = [executor.submit(process_url, url, path, limiter) for url, path in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            # 중간에 멈춰도 끝난 결과는 남도록 한 줄씩 기록
+            manifest.write(json.dumps(result, ensure_ascii=False) + '\n')
+            manifest.flush()
+            if result['status'] == 'ok':
+                succeeded += 1
+                print(f"[{done}/{len(jobs)}] ✅ {result['url']} ({result['total_seconds']}초)", file=sys.stderr)
+            else:
+                print(f"[{done}/{len(jobs)}] ❌ {result['url']}: {result['error']}", file=sys.stderr)
+    return succeeded
+
+def batch_main(args):
+    jobs = plan_downloads(read_urls(args.batch), args.output_dir)
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"📋 URL {len(jobs)}개 일괄 처리 (동시 {args.workers}개, 호스트당 {args.per_host}개)", file=sys.stderr)
+    
+    started = time.monotonic()
+    manifest = sys.stdout if args.manifest == '-' else open(args.manifest, 'a', encoding='utf-8')
+    try:
+        succeeded = run_batch(jobs, args.workers, args.per_host, manifest)
+    finally:
+        if manifest is not sys.stdout:
+            manifest.close()
+    
+    print(f"\n🎉 {succeeded}/{len(jobs)}개 성공 ({time.monotonic() - started:.1f}초)", file=sys.stderr)
+    return 0 if succeeded == len(jobs) else 1
+
 def main():
-    if len(sys.argv) != 2:
+    parser = argparse.ArgumentParser(description='Threads 동영상 다운로더')
+    parser.add_argument('url', nargs='?', help='Threads 게시물 URL')
+    parser.add_argument('--batch', metavar='FILE', help="URL 목록 파일 (한 줄에 하나, '-'이면 표준 입력)")
+    parser.add_argument('--workers', type=int, default=8, help='동시에 처리할 URL 수 (일괄 모드)')
+    parser.add_argument('--per-host', type=int, default=4, help='호스트당 동시 요청 수 (일괄 모드)')
+    parser.add_argument('--output-dir', default='downloads', help='저장 폴더')
+    parser.add_argument('--manifest', default='-', help="결과 JSONL 파일, 이어서 씀 ('-'이면 표준 출력)")
+    args = parser.parse_args()
+    
+    if args.batch:
+        sys.exit(batch_main(args))
+    
+    if not args.url:
         print("사용법: python3 threads_downloader.py [THREADS_URL]")
+        print("       python3 threads_downloader.py --batch urls.txt --manifest results.jsonl")
         print("예시: python3 threads_downloader.py https://www.threads.net/...")
         sys.exit(1)
     
-    url = sys.argv[1]
+    url = args.url
     
     try:
         # 동영상 URL 추출
         video_url = extract_threads_video(url)
         
-        # 파일명 생성
-        output_filename = f"threads_video_{os.urandom(4).hex()}.mp4"
-        output_path = os.path.join('downloads', output_filename)
+        # 파일명 생성 (게시물 코드 기준이라 다시 실행하면 받다 만 .part를 이어받음)
+        os.makedirs(args.output_dir, exist_ok=True)
+        output_path = output_path_for(url, args.output_dir)
         
         # 다운로드
         if download_video(video_url, output_path):
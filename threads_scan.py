@@ -0,0 +1,245 @@
+"""
+Threads 페이지 영상 URL 스캐너
+키 이름만 다른 수십 개의 정규식으로 페이지 전체를 반복해서 훑는 대신,
+키 이름을 하나의 교대(alternation)로 묶은 정규식으로 페이지를 한 번만 훑고
+.mp4/cdninstagram 여부로 점수를 매겨 후보 URL을 순서대로 돌려줍니다.
+응답을 조각 단위로 훑다가 확실한 후보가 나오면 나머지 페이지는 받지 않을 수도 있습니다 (read_page).
+파싱한 상태 JSON(Instagram API 응답, __APOLLO_STATE__ 등)에서는 find_video_urls로 해상도 순 후보를 찾습니다.
+"""
+
+import codecs
+import re
+from collections import namedtuple
+
+# 영상 URL이 들어 있을 수 있는 JSON 키
+VIDEO_KEYS = (
+    'video_url', 'videoUrl', 'playable_url',
+    'playbackUrl', 'playback_url', 'streamUrl', 'stream_url',
+    'contentUrl', 'content_url',
+)
+URL_KEYS = VIDEO_KEYS + ('media_url', 'url', 'src')
+
+_VIDEO_KEY_SET = frozenset(VIDEO_KEYS)
+
+# 이 점수 이상(cdninstagram의 .mp4)인 후보가 나오면 페이지를 더 읽지 않는다
+CONFIDENT_SCORE = 6
+
+# 응답 본문을 읽는 단위 (바이트)
+CHUNK_SIZE = 16 * 1024
+
+# 조각 경계에 걸친 매치를 위해 다음 조각 앞에 다시 붙이는 최대 길이 (URL 최대 길이보다 길게)
+MAX_TAIL = 8192
+
+PageScan = namedtuple('PageScan', ['text', 'candidates', 'complete'])
+
+# 상태 JSON에서 영상 URL 문자열을 값으로 갖는 키
+MEDIA_URL_KEYS = frozenset(VIDEO_KEYS + (
+    'playable_url_quality_hd', 'browser_native_hd_url', 'browser_native_sd_url',
+))
+
+# 영상이 없는 것이 확실해 내려가지 않는 하위 트리
+SKIP_KEYS = frozenset({
+    'image_versions2', 'caption', 'user', 'owner', 'profile_pic_url', 'hd_profile_pic_versions',
+    'text_post_app_info', 'comments', 'preview_comments', 'edge_media_to_comment', 'facepile_top_likers',
+})
+
+# 상태 JSON에서 방문할 최대 노드 수 (거대한 Apollo 캐시에서도 작업량을 제한)
+MAX_NODES = 200000
+
+VideoCandidate = namedtuple('VideoCandidate', ['url', 'width', 'height', 'bitrate'])
+
+# "키":"값". 썸네일/프로필 사진(cdninstagram이어도 영상이 아님)은 정규식 안에서 걸러
+# 파이썬 쪽 루프가 후보가 될 수 있는 값만 보게 한다
+_KEY_RE = re.compile(
+    r'"(' + '|'.join(URL_KEYS) + r')":"'
+    r'(?![^"]*\.(?:jpe?g|png|webp|gif|heic)\b)([^"]+)"'
+)
+
+# "키":"값" 또는 <video|source ... src="값"> (태그가 있는 페이지에서만 사용)
+_TAG_RE = re.compile(r'<(?:video|source)\b')
+_KEY_OR_TAG_RE = re.compile(_KEY_RE.pattern + r'|<(?:video|source)\b[^>]*?\bsrc="([^"]+)"')
+
+# 페이지에 박혀 있는 초기 상태 JSON
+_JSON_BLOB_RE = re.compile(
+    r'<script[^>]*>window\.(?:__INITIAL_STATE__|__APOLLO_STATE__|__NEXT_DATA__)\s*=\s*({[^<]+})</script>'
+    r'|"(?:__INITIAL_STATE__|__APOLLO_STATE__)":\s*({[^}]+})'
+)
+
+_UNICODE_ESCAPE_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+
+def unescape_url(value):
+    """JSON 문자열 안의 \\/ 와 \\uXXXX 이스케이프를 풉니다."""
+    if '\\' not in value:
+        return value
+    value = value.replace('\\/', '/')
+    if '\\u' in value:
+        value = _UNICODE_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), value)
+    return value
+
+
+def _partial_start(buffer, end):
+    """buffer 끝에 걸쳐 있을 수 있는(아직 닫히지 않은) 매치의 가장 이른 시작 위치.
+
+    "키":"값" 매치는 닫는 따옴표 전까지 따옴표가 3개뿐이므로 끝에서 세 번째 따옴표부터,
+    <video|source ...> 태그는 마지막 '<'부터 다시 보면 된다.
+    """
+    start = len(buffer)
+    for _ in range(3):
+        quote = buffer.rfind('"', end, start)
+        if quote < 0:
+            break
+        start = quote
+    tag = buffer.rfind('<', end)
+    if 0 <= tag < start:
+        start = tag
+    return start
+
+
+class StreamScanner:
+    """페이지를 조각 단위로 받아 가며 영상 URL 후보를 찾습니다.
+
+    조각 경계에 걸친 매치를 놓치지 않도록, 끝에서 시작해 아직 끝나지 않았을 수 있는 매치만
+    (최대 max_tail자) 다음 조각 앞에 붙여 다시 훑습니다.
+
+    점수: .mp4 +4, cdninstagram +2, 영상 전용 키(video_url 등)나 <video>/<source> 태그 +1.
+    셋 다 아니면 URL에 'video'가 들어 있을 때만 1점짜리 후보가 됩니다. 이미지 URL은 제외합니다.
+    """
+
+    def __init__(self, stop_score=None, max_tail=MAX_TAIL):
+        self.stop_score = stop_score
+        self.max_tail = max_tail
+        self.best_score = 0
+        self._tail = ''
+        self._count = 0
+        self._best = {}  # 원본 값 -> (-점수, 순서)
+
+    def feed(self, text):
+        """text를 이어서 훑고, stop_score 이상인 후보를 찾았으면 True를 반환합니다."""
+        buffer = self._tail + text if self._tail else text
+        # 태그 교대가 붙으면 정규식이 느려지므로 태그가 없는 구간은 키 패턴만으로 훑는다
+        pattern = _KEY_OR_TAG_RE if _TAG_RE.search(buffer) else _KEY_RE
+        end = 0
+        for match in pattern.finditer(buffer):
+            # 키 패턴은 (키, 값), 태그를 포함한 패턴은 (키, 값, src) 그룹
+            groups = match.groups()
+            self._add(groups[0], groups[1] or groups[-1])
+            end = match.end()
+        self._tail = buffer[max(end, len(buffer) - self.max_tail, _partial_start(buffer, end)):]
+        return self.stop_score is not None and self.best_score >= self.stop_score
+
+    def candidates(self):
+        """지금까지 찾은 후보를 점수가 높은 순(같으면 먼저 나온 순)으로 반환합니다."""
+        best = self._best
+        return [unescape_url(value) for value in sorted(best, key=best.__getitem__)]
+
+    def _add(self, key, value):
+        if value in self._best:
+            return
+        score = 0
+        if '.mp4' in value:
+            score = 4
+        if 'cdninstagram' in value:
+            score += 2
+        if key in _VIDEO_KEY_SET or not key:
+            score += 1
+        elif not score:
+            if 'video' not in value.lower():
+                return
+            score = 1
+        self._best[value] = (-score, self._count)
+        self._count += 1
+        self.best_score = max(self.best_score, score)
+
+
+def scan_video_urls(page):
+    """페이지 전체를 한 번 훑어 영상 URL 후보를 점수가 높은 순으로 반환합니다."""
+    scanner = StreamScanner()
+    scanner.feed(page)
+    return scanner.candidates()
+
+
+def read_page(response, stop_score=CONFIDENT_SCORE, chunk_size=CHUNK_SIZE):
+    """stream=True로 받은 응답을 조각 단위로 디코딩하며 훑습니다.
+
+    stop_score 이상인 후보가 나오면 나머지 본문은 받지 않고 연결을 닫습니다.
+    PageScan(읽은 데까지의 텍스트, 후보 목록, 끝까지 읽었는지)을 반환합니다.
+    """
+    scanner = StreamScanner(stop_score)
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    parts = []
+    complete = True
+    try:
+        for chunk in response.iter_content(chunk_size):
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if scanner.feed(text):
+                complete = False
+                break
+        else:
+            text = decoder.decode(b'', final=True)
+            parts.append(text)
+            scanner.feed(text)
+    finally:
+        response.close()
+    return PageScan(''.join(parts), scanner.candidates(), complete)
+
+
+def _dimension(obj, *keys):
+    for key in keys:
+        value = obj.get(key)
+        if isinstance(value, (int, float)):
+            return int(value)
+    return 0
+
+
+def find_video_urls(data, max_nodes=MAX_NODES):
+    """파싱한 JSON에서 영상 후보를 해상도, 비트레이트 순(같으면 먼저 나온 순)으로 반환합니다.
+
+    재귀 대신 명시적인 스택으로 훑으므로 깊은 구조에서도 RecursionError가 나지 않고,
+    문자열은 video_versions 항목과 MEDIA_URL_KEYS 값만 확인합니다.
+    max_nodes개의 dict/list를 방문하면 그때까지 찾은 후보만 반환합니다.
+    """
+    found = {}  # url -> (정렬 키, VideoCandidate)
+
+    def add(url, obj):
+        if url in found or not url.startswith('http'):
+            return
+        candidate = VideoCandidate(
+            url,
+            _dimension(obj, 'width', 'original_width'),
+            _dimension(obj, 'height', 'original_height'),
+            _dimension(obj, 'bandwidth', 'bitrate'),
+        )
+        found[url] = ((-candidate.width * candidate.height, -candidate.bitrate, len(found)), candidate)
+
+    stack = [data]
+    nodes = 0
+    while stack and nodes < max_nodes:
+        obj = stack.pop()
+        nodes += 1
+        if isinstance(obj, dict):
+            versions = obj.get('video_versions')
+            if isinstance(versions, list):
+                for version in versions:
+                    if isinstance(version, dict) and isinstance(version.get('url'), str):
+                        add(version['url'], version)
+            children = []
+            for key, value in obj.items():
+                if isinstance(value, str):
+                    if key in MEDIA_URL_KEYS:
+                        # 같은 객체에 있는 원본 크기를 해상도로 사용
+                        add(value, obj)
+                elif isinstance(value, (dict, list)) and key not in SKIP_KEYS and key != 'video_versions':
+                    children.append(value)
+            # 스택에서 문서 순서대로 꺼내지도록 거꾸로 넣는다
+            stack.extend(reversed(children))
+        else:
+            stack.extend(value for value in reversed(obj) if isinstance(value, (dict, list)))
+    return [candidate for _, candidate in sorted(found.values(), key=lambda item: item[0])]
+
+
+def iter_json_blobs(page):
+    """페이지에 박혀 있는 초기 상태 JSON 문자열을 나오는 순서대로 돌려줍니다 (한 번만 훑음)."""
+    for match in _JSON_BLOB_RE.finditer(page):
+        yield match.group(1) or match.group(2)
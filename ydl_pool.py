@@ -0,0 +1,219 @@
+"""
+YoutubeDL 인스턴스 풀
+플랫폼 프로필별로 미리 만들어 둔 YoutubeDL 객체를 작업마다 빌려 씁니다.
+추출기, 쿠키 저장소(cookiesfrombrowser 포함), HTTP 핸들러 초기화를 요청마다 반복하지 않습니다.
+빌려줄 때는 outtmpl과 progress hook만 바꾸고, 돌려받을 때 작업별 상태를 되돌립니다.
+병합할 포맷(영상+음성)은 동시에 받아 둘 다 끝나는 즉시 병합합니다.
+쿠키는 CookieStore에서 채우며, 쿠키 파일이 바뀌었을 때만 다시 채웁니다.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import yt_dlp
+from yt_dlp.downloader import get_suitable_downloader
+from yt_dlp.downloader.http import HttpFD
+
+from fragments import BUDGETED_DOWNLOADERS
+from segmented import SegmentedFD
+
+logger = logging.getLogger(__name__)
+
+
+class FormatBatch:
+    """병합할 포맷 count개를 동시에 받습니다.
+
+    yt-dlp는 포맷마다 dl()을 차례로 부르므로, 마지막 포맷 전까지는 백그라운드 스레드에 넘기고
+    바로 성공을 돌려줍니다. 마지막 포맷은 호출한 스레드에서 받은 뒤 나머지를 기다려 전체 결과를
+    돌려주므로, yt-dlp의 병합은 모든 포맷이 끝나는 즉시 시작됩니다.
+    """
+
+    def __init__(self, count):
+        self.remaining = count
+        self.futures = []
+        self._executor = ThreadPoolExecutor(max_workers=count - 1, thread_name_prefix='format')
+
+    def run(self, download):
+        self.remaining -= 1
+        if self.remaining > 0:
+            self.futures.append(self._executor.submit(download))
+            return True, False
+        success, real_download = download()
+        # 먼저 넘긴 포맷의 예외는 여기서 다시 발생해 yt-dlp가 순차 다운로드와 똑같이 처리한다
+        for future in self.futures:
+            partial_success, real = future.result()
+            success = success and partial_success
+            real_download = real_download or real
+        return success, real_download
+
+    def close(self):
+        # 도중에 실패해 마지막 포맷까지 오지 못했어도 백그라운드 다운로드가 끝난 뒤 반납한다
+        self._executor.shutdown(wait=True)
+
+
+class PooledYoutubeDL(yt_dlp.YoutubeDL):
+    """풀에서 쓰는 YoutubeDL. 다운로더만 바꿔 끼웁니다.
+
+    - 단일 HTTP 파일: params['segment_connections']가 2 이상이면 SegmentedFD로 나누어 받음
+    - HLS/DASH 조각: fragment_budget이 있으면 전역 예산 안에서 동시에 받음
+    - 병합할 포맷: params['parallel_formats']가 참이면 FormatBatch로 동시에 받음
+    그 외에는 yt-dlp 기본 다운로더를 씁니다.
+    """
+
+    fragment_budget = None  # FragmentBudget, 풀이 설정
+    job_id = None  # 조각 처리량 집계용, 빌려주는 동안만 설정
+    _format_batch = None
+
+    def process_info(self, info_dict):
+        batch = self._start_format_batch(info_dict)
+        if batch is None:
+            return super().process_info(info_dict)
+        self._format_batch = batch
+        try:
+            return super().process_info(info_dict)
+        finally:
+            self._format_batch = None
+            batch.close()
+
+    def _start_format_batch(self, info_dict):
+        formats = info_dict.get('requested_formats') or ()
+        if len(formats) < 2 or not self.params.get('parallel_formats'):
+            return None
+        # 한 번의 dl()로 모두 받는 경우(ffmpeg 동시 병합, DASH 조각)는 yt-dlp에 맡긴다
+        if get_suitable_downloader(dict(info_dict), self.params) is not None:
+            return None
+        return FormatBatch(len(formats))
+
+    def dl(self, name, info, subtitle=False, test=False):
+        batch = self._format_batch
+        if batch is not None and not (test or subtitle or name == '-'):
+            return batch.run(lambda: self._pooled_dl(name, info, subtitle, test))
+        return self._pooled_dl(name, info, subtitle, test)
+
+    def _pooled_dl(self, name, info, subtitle, test):
+        fd_class = None
+        if not (test or subtitle or name == '-' or not info.get('url')):
+            fd_class = self._pooled_downloader(info)
+        if fd_class is None:
+            return super().dl(name, info, subtitle, test)
+        fd = fd_class(self, self.params)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        new_info = self._copy_infodict(info)
+        if new_info.get('http_headers') is None:
+            new_info['http_headers'] = self._calc_headers(new_info)
+        return fd.download(name, new_info, subtitle)
+
+    def _pooled_downloader(self, info):
+        default = get_suitable_downloader(info, self.params)
+        if default is HttpFD and (self.params.get('segment_connections') or 1) >= 2:
+            return SegmentedFD
+        if self.fragment_budget is not None:
+            return BUDGETED_DOWNLOADERS.get(default)
+        return None
+
+
+class YoutubeDLPool:
+    """ProfileRegistry의 플랫폼 프로필마다 유휴 YoutubeDL을 최대 max_idle개 보관합니다.
+
+    프로필이 다시 읽히면 (registry.version 변경) 이전 버전으로 만든 인스턴스는 버립니다.
+    """
+
+    def __init__(self, registry, max_idle=4, cookie_store=None, fragment_budget=None):
+        self.registry = registry
+        self.cookie_store = cookie_store
+        self.fragment_budget = fragment_budget
+        self.max_idle = max_idle
+        self._idle = {}  # platform -> [(프로필 버전, ydl, 기본 상태)]
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    @contextmanager
+    def checkout(self, platform, outtmpl=None, progress_hooks=(), job_id=None):
+        """작업 하나 동안 쓸 YoutubeDL을 빌려줍니다.
+
+        with 블록 안에서 add_progress_hook으로 추가한 hook도 반납할 때 제거됩니다.
+        job_id를 주면 조각 처리량이 그 작업 이름으로 집계됩니다.
+        """
+        version, ydl, base = self._acquire(platform)
+        ydl.job_id = job_id
+        if self.cookie_store is not None:
+            # 쿠키 파일이 바뀐 경우에만 실제로 다시 채운다
+            base['cookie_version'] = self.cookie_store.apply(ydl.cookiejar, base.get('cookie_version'))
+        if outtmpl:
+            ydl.params['outtmpl'] = dict(base['outtmpl'], default=outtmpl)
+        for hook in progress_hooks:
+            ydl.add_progress_hook(hook)
+        try:
+            yield ydl
+        finally:
+            if job_id is not None and self.fragment_budget is not None:
+                self.fragment_budget.end_job(job_id)
+            self._reset(ydl, base)
+            self._release(platform, (version, ydl, base))
+
+    def stats(self):
+        with self._lock:
+            idle = sum(len(entries) for entries in self._idle.values())
+        return {
+            'idle': idle,
+            'created': self.created,
+            'reused': self.reused,
+            'discarded': self.discarded,
+        }
+
+    def _acquire(self, platform):
+        # 설정 파일 변경 확인은 템플릿 조회 때만 일어나므로, 유휴 인스턴스를 재사용하기 전에 직접 확인
+        version = self.registry.current_version()
+        stale = []
+        entry = None
+        with self._lock:
+            entries = self._idle.get(platform, [])
+            while entries:
+                candidate = entries.pop()
+                if candidate[0] == version:
+                    entry = candidate
+                    self.reused += 1
+                    break
+                stale.append(candidate[1])
+            else:
+                self.created += 1
+            self.discarded += len(stale)
+        for ydl in stale:
+            self._close(ydl)
+        if entry is not None:
+            return entry
+        ydl = PooledYoutubeDL(self.registry.options(platform))
+        ydl.fragment_budget = self.fragment_budget
+        base = {'outtmpl': dict(ydl.params['outtmpl']), 'progress_hooks': list(ydl._progress_hooks)}
+        return version, ydl, base
+
+    def _release(self, platform, entry):
+        with self._lock:
+            entries = self._idle.setdefault(platform, [])
+            if entry[0] == self.registry.version and len(entries) < self.max_idle:
+                entries.append(entry)
+                return
+            self.discarded += 1
+        self._close(entry[1])
+
+    @staticmethod
+    def _reset(ydl, base):
+        # 작업별 상태만 되돌린다. 추출기 인스턴스와 쿠키 저장소는 그대로 재사용한다.
+        ydl.params['outtmpl'] = dict(base['outtmpl'])
+        ydl._progress_hooks[:] = base['progress_hooks']
+        ydl._download_retcode = 0
+        ydl._playlist_level = 0
+        ydl._playlist_urls.clear()
+        ydl.job_id = None
+
+    @staticmethod
+    def _close(ydl):
+        try:
+            ydl.close()
+        except Exception as e:
+            logger.warning(f"YoutubeDL 정리 실패: {str(e)}")